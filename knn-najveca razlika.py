@@ -4,10 +4,9 @@ from tkinter import messagebox
 import cv2
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
-import numpy as np
-from sklearn.neighbors import NearestNeighbors
-from scipy.ndimage import convolve, maximum_filter
-from sklearn.cluster import DBSCAN
+
+from swarm_core import RasterView, open_raster, regions as region_detection
+from swarm_core.raster import RASTER_SUFFIXES, preview
 
 class TerrainAnalyzer:
     def __init__(self, root):
@@ -18,6 +17,7 @@ class TerrainAnalyzer:
         self.canvas = None
         self.image = None
         self.image_path = None
+        self.raster = None  # Memory-mapped full-resolution raster behind a preview image
 
         load_btn = tk.Button(root, text="Load Image", command=self.load_image)
         load_btn.pack(side=tk.LEFT, padx=10, pady=10)
@@ -28,16 +28,43 @@ class TerrainAnalyzer:
         reset_btn = tk.Button(root, text="Reset", command=self.reset)
         reset_btn.pack(side=tk.LEFT, padx=10, pady=10)
 
+        self.num_workers = tk.IntVar(value=1)
+        workers_label = tk.Label(root, text="Workers:")
+        workers_label.pack(side=tk.LEFT, padx=5)
+        workers_entry = tk.Entry(root, textvariable=self.num_workers, width=5)
+        workers_entry.pack(side=tk.LEFT, padx=5)
+
+        self.use_threads = tk.BooleanVar(value=False)
+        threads_check = tk.Checkbutton(root, text="Threads", variable=self.use_threads)
+        threads_check.pack(side=tk.LEFT, padx=5)
+
+        self.label_regions = tk.BooleanVar(value=False)
+        label_check = tk.Checkbutton(root, text="Label Regions", variable=self.label_regions)
+        label_check.pack(side=tk.LEFT, padx=5)
+
     def load_image(self):
         file_path = filedialog.askopenfilename()
         if not file_path:
             return
 
         self.image_path = file_path
-        self.image = cv2.imread(file_path)
-        self.image = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+        self.raster = None
+        if file_path.lower().endswith(RASTER_SUFFIXES):
+            # Huge .npy/GeoTIFF height maps stay on disk; only a strided preview is loaded
+            self.raster = open_raster(file_path)
+            self.image, _ = preview(self.raster)
+        else:
+            self.image = cv2.imread(file_path)
+            self.image = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
         self.display_image()
 
+    def image_extent(self):
+        # Stretch a preview over full-resolution pixel coordinates so results line up
+        if self.raster is None:
+            return None
+        height, width = self.raster.shape[:2]
+        return (-0.5, width - 0.5, height - 0.5, -0.5)
+
     def display_image(self):
         if self.image is None:
             messagebox.showerror("Error", "No image loaded!")
@@ -48,7 +75,7 @@ class TerrainAnalyzer:
             self.canvas.get_tk_widget().destroy()
 
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.imshow(self.image)
+        ax.imshow(self.image, extent=self.image_extent())
         ax.axis('off')
 
         self.canvas = FigureCanvasTkAgg(fig, master=self.root)
@@ -61,50 +88,49 @@ class TerrainAnalyzer:
             return
 
         # Convert the image to grayscale for simplicity
-        height_map = cv2.cvtColor(self.image, cv2.COLOR_RGB2GRAY)
-
-        # Apply a simple convolution (Gaussian filter for smoothing or Sobel for edges)
-        kernel = np.array([[1, 1, 1], [1, -7, 1], [1, 1, 1]])  # Simple edge detection filter
-        convolved_image = convolve(height_map, kernel)
-
-        # Find local maxima using maximum_filter
-        local_maxima = self.find_local_maxima(convolved_image)
-
-        # Find regions around the maxima
-        regions = self.find_maxima_regions(local_maxima)
+        if self.raster is not None:
+            height_map = RasterView(self.raster, "gray")  # Converted tile by tile as it is read
+        else:
+            height_map = cv2.cvtColor(self.image, cv2.COLOR_RGB2GRAY)
+
+        workers = self.num_workers.get()
+        pool = "thread" if self.use_threads.get() else "process"
+
+        tiled = self.raster is not None or workers > 1
+        if self.label_regions.get():
+            # Label the mask of maxima directly: same boxes as DBSCAN, fast even on flat images
+            if tiled:
+                # Each tile is labelled on its own and clusters are merged across tile borders
+                regions = region_detection.tiled_mask_regions(height_map, eps=20, pad=10, tile=1024, size=20,
+                                                              workers=workers, pool=pool)
+            else:
+                mask = region_detection.edge_maxima(height_map, size=20)
+                regions = region_detection.mask_regions(mask, eps=20, pad=10)
+        else:
+            if tiled:
+                # Filter in 1024-pixel tiles (with overlapping halos), spread over the workers
+                local_maxima = region_detection.tiled_maxima(height_map, tile=1024, size=20, workers=workers,
+                                                             pool=pool)
+            else:
+                # Apply a simple edge-detection convolution, then find its local maxima
+                local_maxima = self.find_local_maxima(height_map)
+
+            # Find regions around the maxima
+            regions = self.find_maxima_regions(local_maxima, workers, pool)
 
         # Display results
         self.display_results(regions)
 
-    def find_local_maxima(self, image):
-        # Use a maximum filter to find local maxima
-        neighborhood_size = 20  # Size of the neighborhood to check for maxima
-        local_maxima = maximum_filter(image, size=neighborhood_size) == image
-        return np.argwhere(local_maxima)
-
-    def find_maxima_regions(self, local_maxima):
-        # DBSCAN clustering to group nearby maxima into regions
-        if len(local_maxima) == 0:
-            return []
-
-        # Use DBSCAN to cluster nearby maxima into regions
-        clustering = DBSCAN(eps=20, min_samples=1).fit(local_maxima)  # Adjust eps for your image scale
-        labels = clustering.labels_
-
-        # Group regions based on clusters
-        regions = []
-        for cluster_id in np.unique(labels):
-            # Get coordinates of maxima in this cluster
-            cluster_coords = local_maxima[labels == cluster_id]
-            if len(cluster_coords) > 1:
-                # Calculate the bounding box for the cluster
-                x_min = np.min(cluster_coords[:, 1]) - 10
-                x_max = np.max(cluster_coords[:, 1]) + 10
-                y_min = np.min(cluster_coords[:, 0]) - 10
-                y_max = np.max(cluster_coords[:, 0]) + 10
-                regions.append(((x_min, y_min), (x_max, y_max)))
-
-        return regions
+    def find_local_maxima(self, height_map):
+        # Maxima of the edge response over a 20-pixel neighborhood
+        return region_detection.local_maxima(height_map, size=20)
+
+    def find_maxima_regions(self, local_maxima, workers=1, pool="process"):
+        # DBSCAN clustering to group nearby maxima into regions; with several
+        # workers each tile is clustered separately and clusters are merged across tile edges
+        tile = 1024 if workers > 1 else None
+        return region_detection.maxima_regions(local_maxima, eps=20, pad=10, tile=tile, workers=workers,
+                                               pool=pool)  # Adjust eps for your image scale
 
     def display_results(self, regions):
         if len(regions) == 0:
@@ -112,7 +138,7 @@ class TerrainAnalyzer:
             return
 
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.imshow(self.image)
+        ax.imshow(self.image, extent=self.image_extent())
 
         # Plot regions as rectangles
         for (x_min, y_min), (x_max, y_max) in regions:
@@ -132,6 +158,7 @@ class TerrainAnalyzer:
     def reset(self):
         self.image = None
         self.image_path = None
+        self.raster = None
         if self.canvas:
             self.canvas.get_tk_widget().destroy()
             self.canvas = None
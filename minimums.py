@@ -4,8 +4,9 @@ from tkinter import messagebox
 import cv2
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
-import numpy as np
-import random
+
+from swarm_core import PyramidTerrainOptimizer, RasterView, TerrainOptimizer, open_raster
+from swarm_core.raster import RASTER_SUFFIXES, preview
 
 class TerrainAnalyzer:
     def __init__(self, root):
@@ -16,10 +17,13 @@ class TerrainAnalyzer:
         self.canvas = None
         self.image = None
         self.image_path = None
+        self.raster = None  # Memory-mapped full-resolution raster behind a preview image
 
         # Parameters for PSO
         self.num_particles = tk.IntVar(value=100)
         self.num_iterations = tk.IntVar(value=50)
+        self.gradient_refinement = tk.BooleanVar(value=False)
+        self.pyramid_mode = tk.BooleanVar(value=False)
 
         load_btn = tk.Button(root, text="Load Image", command=self.load_image)
         load_btn.pack(side=tk.LEFT, padx=10, pady=10)
@@ -40,16 +44,35 @@ class TerrainAnalyzer:
         iteration_entry = tk.Entry(root, textvariable=self.num_iterations, width=5)
         iteration_entry.pack(side=tk.LEFT, padx=5)
 
+        gradient_check = tk.Checkbutton(root, text="Gradient Refinement", variable=self.gradient_refinement)
+        gradient_check.pack(side=tk.LEFT, padx=5)
+
+        pyramid_check = tk.Checkbutton(root, text="Pyramid", variable=self.pyramid_mode)
+        pyramid_check.pack(side=tk.LEFT, padx=5)
+
     def load_image(self):
         file_path = filedialog.askopenfilename()
         if not file_path:
             return
 
         self.image_path = file_path
-        self.image = cv2.imread(file_path)
-        self.image = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+        self.raster = None
+        if file_path.lower().endswith(RASTER_SUFFIXES):
+            # Huge .npy/GeoTIFF height maps stay on disk; only a strided preview is loaded
+            self.raster = open_raster(file_path)
+            self.image, _ = preview(self.raster)
+        else:
+            self.image = cv2.imread(file_path)
+            self.image = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
         self.display_image()
 
+    def image_extent(self):
+        # Stretch a preview over full-resolution pixel coordinates so results line up
+        if self.raster is None:
+            return None
+        height, width = self.raster.shape[:2]
+        return (-0.5, width - 0.5, height - 0.5, -0.5)
+
     def display_image(self):
         if self.image is None:
             messagebox.showerror("Error", "No image loaded!")
@@ -60,7 +83,7 @@ class TerrainAnalyzer:
             self.canvas.get_tk_widget().destroy()
 
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.imshow(self.image)
+        ax.imshow(self.image, extent=self.image_extent())
         ax.axis('off')
 
         self.canvas = FigureCanvasTkAgg(fig, master=self.root)
@@ -73,90 +96,52 @@ class TerrainAnalyzer:
             return
 
         # Interpret the image's terrain based on RGB values
-        height_map = self.image[:, :, 0]  # Use the red channel to approximate height
+        if self.raster is not None:
+            # Particles read the memory-mapped raster directly, pixel by pixel
+            height_map = RasterView(self.raster, channel=0 if self.raster.ndim == 3 else None)
+        else:
+            height_map = self.image[:, :, 0]  # Use the red channel to approximate height
 
         # PSO parameters
         num_particles = self.num_particles.get()
         num_iterations = self.num_iterations.get()
 
         # Particle Swarm Optimization
-        height, width = height_map.shape
-        particles = [
-            {
-                "position": np.array([random.randint(0, width - 1), random.randint(0, height - 1)]),
-                "velocity": np.array([random.uniform(-1, 1), random.uniform(-1, 1)]),
-                "best_position": None,
-                "best_value": float("inf"),
-            }
-            for _ in range(num_particles)
-        ]
-
-        global_best_positions = []
-        global_best_values = []
+        # Sub-pixel particles on a bilinear float32 map, optionally nudged along the Sobel gradient
+        gradient_step = 1.0 if self.gradient_refinement.get() else None
+        if self.pyramid_mode.get():
+            # Search a 4x-downsampled map, then refine the extrema in full-resolution windows
+            optimizer = PyramidTerrainOptimizer(height_map, num_particles, levels=3, subpixel=True,
+                                                gradient_step=gradient_step)
+        else:
+            optimizer = TerrainOptimizer(height_map, num_particles, subpixel=True, gradient_step=gradient_step)
 
         # Set up figure for dynamic visualization
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.imshow(self.image)
+        ax.imshow(self.image, extent=self.image_extent())
         particle_plot, = ax.plot([], [], 'mo', markersize=5, label='Particles')  # Purple dots
         ax.legend()
 
-        def update_particles():
-            x_coords = [particle["position"][0] for particle in particles]
-            y_coords = [particle["position"][1] for particle in particles]
-            particle_plot.set_data(x_coords, y_coords)
+        def update_particles(optimizer):
+            particle_plot.set_data(optimizer.positions[:, 0], optimizer.positions[:, 1])
             fig.canvas.draw()
             fig.canvas.flush_events()
-
-        plt.ion()
-
-        for iteration in range(num_iterations):
-            for particle in particles:
-                x, y = particle["position"].astype(int)
-                value = height_map[y, x]
-
-                # Update personal best
-                if value < particle["best_value"]:
-                    particle["best_value"] = value
-                    particle["best_position"] = particle["position"].copy()
-
-            # Identify global bests for this iteration
-            sorted_particles = sorted(particles, key=lambda p: p["best_value"])
-            if sorted_particles:
-                best_particle = sorted_particles[0]
-                if best_particle["best_value"] not in global_best_values:
-                    global_best_positions.append(best_particle["best_position"])
-                    global_best_values.append(best_particle["best_value"])
-
-                # Update particle velocities and positions
-                for particle in particles:
-                    inertia = 0.5
-                    cognitive = random.uniform(0, 1)
-                    social = random.uniform(0, 1)
-                    particle["velocity"] = (
-                        inertia * particle["velocity"]
-                        + cognitive * (particle["best_position"] - particle["position"])
-                        + social * (best_particle["best_position"] - particle["position"])
-                    )
-                    particle["velocity"] = particle["velocity"].astype(float)
-                    particle["position"] = (particle["position"] + particle["velocity"]).astype(int)
-                    particle["position"] = np.clip(particle["position"], [0, 0], [width - 1, height - 1])
-
-            # Update particle visualization after each iteration
-            update_particles()
             plt.pause(0.1)  # Pause to visualize each iteration
 
+        plt.ion()
+        optimizer.run(num_iterations, callback=update_particles)
         plt.ioff()
 
         # Display results
-        self.display_results(global_best_positions)
+        self.display_results(optimizer.extrema.positions)
 
     def display_results(self, global_best_positions):
-        if not global_best_positions:
+        if len(global_best_positions) == 0:
             messagebox.showinfo("Result", "No local minima found!")
             return
 
         fig, ax = plt.subplots(figsize=(8, 6))
-        ax.imshow(self.image)
+        ax.imshow(self.image, extent=self.image_extent())
         for position in global_best_positions:
             x, y = position.astype(int)
             ax.plot(x, y, 'bo', markersize=8, label='Local Minimum')
@@ -174,6 +159,7 @@ class TerrainAnalyzer:
     def reset(self):
         self.image = None
         self.image_path = None
+        self.raster = None
         if self.canvas:
             self.canvas.get_tk_widget().destroy()
             self.canvas = None
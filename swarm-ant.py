@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import AntColonyOptimizer
+
 class ImageEditorApp:
     def __init__(self, root):
         self.root = root
@@ -35,6 +36,21 @@ class ImageEditorApp:
         self.iterations_entry = tk.Entry(self.toolbar, width=5)
         self.iterations_entry.pack(side=tk.LEFT, padx=5)
 
+        tk.Label(self.toolbar, text="Local Search:").pack(side=tk.LEFT, padx=5)
+        self.local_search_selector = ttk.Combobox(self.toolbar, values=["None", "Best Ant", "All Ants"], state="readonly")
+        self.local_search_selector.set("None")
+        self.local_search_selector.pack(side=tk.LEFT, padx=5)
+
+        # Leave Candidates empty to consider every city on each move
+        tk.Label(self.toolbar, text="Candidates:").pack(side=tk.LEFT, padx=5)
+        self.candidate_count_entry = tk.Entry(self.toolbar, width=5)
+        self.candidate_count_entry.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(self.toolbar, text="Workers:").pack(side=tk.LEFT, padx=5)
+        self.workers_entry = tk.Entry(self.toolbar, width=5)
+        self.workers_entry.insert(0, "1")
+        self.workers_entry.pack(side=tk.LEFT, padx=5)
+
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
@@ -43,6 +59,7 @@ class ImageEditorApp:
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
+        self.optimizer = None
         self.current_line = None
 
     def load_image(self):
@@ -79,15 +96,14 @@ class ImageEditorApp:
         self.drawings.clear()
         self.paths.clear()
 
-    def calculate_distance(self, point1, point2):
-        return np.linalg.norm(np.array(point1) - np.array(point2))
-
     def run_simulation(self):
         try:
             ant_count = int(self.ant_count_entry.get())
             iterations = int(self.iterations_entry.get())
+            workers = int(self.workers_entry.get() or 1)
+            candidate_count = int(self.candidate_count_entry.get()) if self.candidate_count_entry.get() else None
         except ValueError:
-            messagebox.showerror("Error", "Ant Count and Iterations must be integers.")
+            messagebox.showerror("Error", "Ant Count, Iterations, Candidates and Workers must be integers.")
             return
 
         if not self.drawings:
@@ -99,68 +115,14 @@ class ImageEditorApp:
             messagebox.showerror("Error", "At least two points are required for ACO.")
             return
 
-        self.run_aco(points, ant_count, iterations)
-
-    def run_aco(self, points, ant_count, iterations):
-        num_points = len(points)
-
-        # Distance matrix
-        distances = np.zeros((num_points, num_points))
-        for i in range(num_points):
-            for j in range(num_points):
-                if i != j:
-                    distances[i][j] = self.calculate_distance(points[i], points[j])
-
-        # Initialize pheromones
-        pheromones = np.ones((num_points, num_points))
-        best_path = None
-        best_length = float("inf")
-
-        for iteration in range(iterations):
-            all_paths = []
-            path_lengths = []
-
-            for ant in range(ant_count):
-                start_point = np.random.choice(range(num_points))
-                path = [start_point]
+        self.run_aco(points, ant_count, iterations, workers, candidate_count)
 
-                while len(path) < num_points:
-                    current = path[-1]
-                    probabilities = []
-
-                    for next_point in range(num_points):
-                        if next_point not in path:
-                            probabilities.append((pheromones[current][next_point] / distances[current][next_point]))
-                        else:
-                            probabilities.append(0)
-
-                    probabilities = np.array(probabilities)
-                    probabilities /= probabilities.sum()
-
-                    next_point = np.random.choice(range(num_points), p=probabilities)
-                    path.append(next_point)
-
-                    # Visualize ant movement
-                    x1, y1 = points[current]
-                    x2, y2 = points[next_point]
-                    self.canvas.create_line(x1, y1, x2, y2, fill="green", width=1)
-                    self.root.update()
-                    time.sleep(0.1)
-
-                all_paths.append(path)
-
-                length = sum(distances[path[i]][path[i+1]] for i in range(-1, num_points - 1))
-                path_lengths.append(length)
-
-                if length < best_length:
-                    best_length = length
-                    best_path = path
-
-            # Update pheromones
-            pheromones *= 0.9
-            for path, length in zip(all_paths, path_lengths):
-                for i in range(-1, num_points - 1):
-                    pheromones[path[i]][path[i+1]] += 1 / length
+    def run_aco(self, points, ant_count, iterations, workers=1, candidate_count=None):
+        local_search = {"None": None, "Best Ant": "best", "All Ants": "all"}[self.local_search_selector.get()]
+        self.optimizer = AntColonyOptimizer(points, ant_count, candidate_count=candidate_count, workers=workers,
+                                            local_search=local_search)
+        with self.optimizer:
+            best_path, best_length = self.optimizer.run(iterations, callback=self.show_ants)
 
         # Visualize best path
         for i in range(len(best_path) - 1):
@@ -168,6 +130,16 @@ class ImageEditorApp:
             x2, y2 = points[best_path[i + 1]]
             self.canvas.create_line(x1, y1, x2, y2, fill="yellow", width=3)
 
+    def show_ants(self, optimizer):
+        # Visualize the tours built by the ants in this iteration
+        for path in optimizer.paths:
+            for i in range(len(path) - 1):
+                x1, y1 = optimizer.points[path[i]]
+                x2, y2 = optimizer.points[path[i + 1]]
+                self.canvas.create_line(x1, y1, x2, y2, fill="green", width=1)
+        self.root.update()
+        time.sleep(0.1)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = ImageEditorApp(root)
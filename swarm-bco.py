@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import BeeColonyOptimizer, DrawingFitness, image_bounds
+
 class ImageEditorApp:
     def __init__(self, root):
         self.root = root
@@ -18,6 +19,7 @@ class ImageEditorApp:
         self.image = None
         self.image_tk = None
         self.drawings = []  # List of drawn items
+        self.fitness_model = None  # Drawings packed for batched fitness
         self.swarm = []  # Bee visualizations
         self.paths = []  # Paths of bees for visualization
 
@@ -39,6 +41,10 @@ class ImageEditorApp:
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.field_lookup_var = tk.BooleanVar()
+        self.field_lookup_checkbox = tk.Checkbutton(self.toolbar, text="Precompute Field", variable=self.field_lookup_var)
+        self.field_lookup_checkbox.pack(side=tk.LEFT, padx=5)
+
         self.show_path_var = tk.BooleanVar()
         self.show_path_checkbox = tk.Checkbutton(self.toolbar, text="Show Bee Paths", variable=self.show_path_var)
         self.show_path_checkbox.pack(side=tk.LEFT, padx=5)
@@ -48,7 +54,7 @@ class ImageEditorApp:
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
-        self.bees = []
+        self.optimizer = None
         self.current_line = None
 
     def load_image(self):
@@ -59,6 +65,7 @@ class ImageEditorApp:
             self.canvas.config(width=self.image.width, height=self.image.height)
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
             self.drawings.clear()
+            self.fitness_model = None
             self.swarm.clear()
             self.paths.clear()
 
@@ -67,6 +74,7 @@ class ImageEditorApp:
         self.current_line = [(x, y)]
         point = self.canvas.create_oval(x-2, y-2, x+2, y+2, fill="red", outline="red")
         self.drawings.append(("point", (x, y)))
+        self.fitness_model = None
 
     def draw_line(self, event):
         if self.current_line:
@@ -78,37 +86,26 @@ class ImageEditorApp:
     def end_drawing(self, event):
         if self.current_line and len(self.current_line) > 1:
             self.drawings.append(("line", self.current_line))
+            self.fitness_model = None
         self.current_line = None
 
     def clear_drawing(self):
         for item in self.canvas.find_all():
             self.canvas.delete(item)
         self.drawings.clear()
+        self.fitness_model = None
         self.swarm.clear()
         self.paths.clear()
 
     def calculate_fitness(self, position):
-        fitness = 0
-        for shape, coords in self.drawings:
-            if shape == "point":
-                px, py = coords
-                distance = np.linalg.norm(np.array(position) - np.array([px, py]))
-                fitness += distance
-            elif shape == "line":
-                for i in range(len(coords) - 1):
-                    x1, y1 = coords[i]
-                    x2, y2 = coords[i + 1]
-                    line_vec = np.array([x2 - x1, y2 - y1])
-                    point_vec = np.array(position) - np.array([x1, y1])
-                    line_len = np.linalg.norm(line_vec)
-                    if line_len > 0:
-                        line_unit_vec = line_vec / line_len
-                        proj_length = np.dot(point_vec, line_unit_vec)
-                        proj_length = max(0, min(line_len, proj_length))
-                        closest_point = np.array([x1, y1]) + proj_length * line_unit_vec
-                        distance = np.linalg.norm(position - closest_point)
-                        fitness += distance / (len(coords) - 1)
-        return fitness
+        # Accepts a single (2,) position or an (N, 2) batch
+        if self.fitness_model is None:
+            self.fitness_model = DrawingFitness(self.drawings, normalize_lines=True)
+        if self.field_lookup_var.get():
+            # Rasterized once per drawing, then sampled bilinearly
+            field = self.fitness_model.distance_field(self.image.width, self.image.height)
+            return field(position)
+        return self.fitness_model(position)
 
     def run_simulation(self):
         try:
@@ -125,90 +122,28 @@ class ImageEditorApp:
         self.run_abc(swarm_size, iterations)
 
     def run_abc(self, swarm_size, iterations):
-        # Initialize Bees with random positions
-        self.bees = [
-            {
-                "position": np.array([
-                    np.random.randint(0, self.image.width),
-                    np.random.randint(0, self.image.height)
-                ], dtype=np.float64),
-                "fitness": float("inf"),
-                "trial": 0,  # Trial count to track how long a bee has failed to improve
-                "path": []  # To store the path of each bee
-            }
-            for _ in range(swarm_size)
-        ]
-
-        best_bee = None
-
-        for iteration in range(iterations):
-            # Evaluate fitness of each bee (employee bees)
-            for bee in self.bees:
-                bee["fitness"] = self.calculate_fitness(bee["position"])
-
-            # Find the best bee (minimum fitness)
-            best_bee = min(self.bees, key=lambda bee: bee["fitness"])
-
-            # Employed Bees phase: search around their position
-            for bee in self.bees:
-                # Store the position of the bee for path visualization
-                bee["path"].append(tuple(bee["position"]))
-
-                # Generate new candidate solution with a larger step for speed
-                step_size = np.random.uniform(5, 10)  # Increase step size to speed up the bees
-                new_position = bee["position"] + np.random.uniform(-step_size, step_size, 2)
-                new_position = np.clip(new_position, [0, 0], [self.image.width - 1, self.image.height - 1])
-
-                new_fitness = self.calculate_fitness(new_position)
-
-                # If new solution is better, replace the current one
-                if new_fitness < bee["fitness"]:
-                    bee["position"] = new_position
-                    bee["fitness"] = new_fitness
-                    bee["trial"] = 0
-                else:
-                    bee["trial"] += 1
-
-            # Onlooker Bees phase: select based on fitness
-            for bee in self.bees:
-                if np.random.rand() < 0.5:  # A simple criterion to select bees for onlooker behavior
-                    # Store the position of the bee for path visualization
-                    bee["path"].append(tuple(bee["position"]))
-
-                    step_size = np.random.uniform(5, 10)
-                    new_position = bee["position"] + np.random.uniform(-step_size, step_size, 2)
-                    new_position = np.clip(new_position, [0, 0], [self.image.width - 1, self.image.height - 1])
-
-                    new_fitness = self.calculate_fitness(new_position)
-                    if new_fitness < bee["fitness"]:
-                        bee["position"] = new_position
-                        bee["fitness"] = new_fitness
-                        bee["trial"] = 0
-
-            # Scout Bees phase: random exploration if no improvement
-            for bee in self.bees:
-                if bee["trial"] > 10:  # If a bee has failed for a certain number of trials
-                    bee["position"] = np.array([np.random.randint(0, self.image.width),
-                                                np.random.randint(0, self.image.height)])
-                    bee["fitness"] = self.calculate_fitness(bee["position"])
-                    bee["trial"] = 0
-
-            # Visualization of Bees and their paths
-            self.clear_swarm()
-            for bee in self.bees:
-                x, y = bee["position"]
-                dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
-                self.swarm.append(dot)
-
-                # Draw path if enabled
-                if self.show_path_var.get():
-                    for i in range(1, len(bee["path"])):
-                        x1, y1 = bee["path"][i-1]
-                        x2, y2 = bee["path"][i]
-                        self.canvas.create_line(x1, y1, x2, y2, fill="yellow", width=2)
-
-            self.root.update()
-            time.sleep(0.05)  # Reduce the sleep time to speed up the simulation
+        bounds = image_bounds(self.image.width, self.image.height)
+        self.optimizer = BeeColonyOptimizer(self.calculate_fitness, bounds, swarm_size)
+        self.optimizer.run(iterations, callback=self.show_swarm)
+
+    def show_swarm(self, optimizer):
+        # Visualization of Bees and their paths
+        self.clear_swarm()
+        paths = optimizer.paths.ordered()
+        for i, (x, y) in enumerate(optimizer.positions):
+            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
+            self.swarm.append(dot)
+
+            # Draw path if enabled
+            if self.show_path_var.get():
+                path = paths[:, i]
+                for j in range(1, len(path)):
+                    x1, y1 = path[j-1]
+                    x2, y2 = path[j]
+                    self.canvas.create_line(x1, y1, x2, y2, fill="yellow", width=2)
+
+        self.root.update()
+        time.sleep(0.05)  # Reduce the sleep time to speed up the simulation
 
     def clear_swarm(self):
         for dot in self.swarm:
@@ -1,93 +1,17 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import DragonflyOptimizer, DrawingFitness, RBFKernel, image_bounds
 
-class GaussianProcess:
-    def __init__(self, kernel, noise=1e-5):
-        self.kernel = kernel
-        self.noise = noise
-        self.X_train = None
-        self.Y_train = None
-
-    def fit(self, X, Y):
-        self.X_train = X
-        self.Y_train = Y
-
-    def predict(self, X):
-        K = self.kernel(self.X_train, self.X_train) + self.noise * np.eye(len(self.X_train))
-        K_s = self.kernel(self.X_train, X)
-        K_ss = self.kernel(X, X) + 1e-8 * np.eye(len(X))  
-        K_inv = np.linalg.inv(K)
-        mu = K_s.T.dot(K_inv).dot(self.Y_train)
-        cov = K_ss - K_s.T.dot(K_inv).dot(K_s)
-        return mu, np.diag(cov)
-
-
-class RBFKernel:
-    def __init__(self, length_scale=1.0):
-        self.length_scale = length_scale
-
-    def __call__(self, X1, X2):
-        sqdist = np.sum(X1**2, axis=1).reshape(-1, 1) + np.sum(X2**2, axis=1) - 2 * np.dot(X1, X2.T)
-        return np.exp(-0.5 * sqdist / self.length_scale**2)
-
-
-class DragonflyOptimizer:
-    def __init__(self, objective_function, bounds, kernel, acquisition_function="UCB", noise=1e-5):
-        self.objective_function = objective_function
-        self.bounds = bounds
-        self.kernel = kernel
-        self.acquisition_function = acquisition_function
-        self.gp = GaussianProcess(kernel)
-        self.X_sample = []
-        self.Y_sample = []
-
-    def acquisition(self, X, gp):
-        mu, sigma = gp.predict(X)
-        kappa = 2.0
-        return mu + kappa * sigma
-
-    def optimize(self, num_iterations, swarm_size, random_initial_points=5):
-        swarm_positions = np.random.uniform(self.bounds[:, 0], self.bounds[:, 1], size=(swarm_size, self.bounds.shape[0]))
-
-        for iteration in range(num_iterations):
-            # Acquisition step: find best acquisition value
-            acquisition_values = np.array([self.acquisition(x.reshape(1, -1), self.gp) for x in swarm_positions])
-            best_index = np.argmax(acquisition_values)
-            best_position = swarm_positions[best_index]
-            best_value = self.objective_function(best_position)
-
-            # Visualize the swarm particles
-            self.update_swarm_positions(swarm_positions)
-
-            # Update particles towards optimal solution
-            swarm_positions += np.random.randn(swarm_size, self.bounds.shape[0]) * 0.1  # random movement
-            swarm_positions = np.clip(swarm_positions, self.bounds[:, 0], self.bounds[:, 1])
-
-            # Update GP with new data
-            self.X_sample = np.vstack([self.X_sample, best_position])
-            self.Y_sample = np.append(self.Y_sample, best_value)
-            self.gp.fit(self.X_sample, self.Y_sample)
-
-            print(f"Iteration: {iteration + 1}, Best value: {best_value} at {best_position}")
-            time.sleep(0.1)  # Pause for visualization
-        return best_position, best_value
-
-    def update_swarm_positions(self, swarm_positions):
-        self.clear_swarm()
-        for pos in swarm_positions:
-            x, y = pos
-            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
-            self.swarm.append(dot)
-        self.root.update()
-
-    def clear_swarm(self):
-        for dot in self.swarm:
-            self.canvas.delete(dot)
-        self.swarm.clear()
+# GP mode label -> (gp_mode, sparse_method)
+GP_MODES = {
+    "Exact": ("exact", "FITC"),
+    "Window": ("window", "FITC"),
+    "Sparse FITC": ("sparse", "FITC"),
+    "Sparse SoR": ("sparse", "SoR"),
+}
 
 
 class ImageEditorApp:
@@ -104,6 +28,7 @@ class ImageEditorApp:
         self.image = None
         self.image_tk = None
         self.drawings = []  # List of drawn items
+        self.fitness_model = None  # Drawings packed for batched fitness
         self.swarm = []  # Swarm particles
 
         # Buttons and inputs
@@ -128,15 +53,31 @@ class ImageEditorApp:
         self.algorithm_selector.set("DA")
         self.algorithm_selector.pack(side=tk.LEFT, padx=5)
 
+        tk.Label(self.toolbar, text="Acquisition:").pack(side=tk.LEFT, padx=5)
+        self.acquisition_selector = ttk.Combobox(self.toolbar, values=["UCB", "EI", "PI"], state="readonly", width=5)
+        self.acquisition_selector.set("UCB")
+        self.acquisition_selector.pack(side=tk.LEFT, padx=5)
+
+        # The approximate modes stay fast on long runs; their error against an exact GP is printed after the run
+        tk.Label(self.toolbar, text="GP Mode:").pack(side=tk.LEFT, padx=5)
+        self.gp_mode_selector = ttk.Combobox(self.toolbar, values=list(GP_MODES), state="readonly", width=11)
+        self.gp_mode_selector.set("Exact")
+        self.gp_mode_selector.pack(side=tk.LEFT, padx=5)
+
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.field_lookup_var = tk.BooleanVar()
+        self.field_lookup_checkbox = tk.Checkbutton(self.toolbar, text="Precompute Field", variable=self.field_lookup_var)
+        self.field_lookup_checkbox.pack(side=tk.LEFT, padx=5)
+
         # Event bindings
         self.canvas.bind("<Button-1>", self.start_drawing)
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
         # Settings for Dragonfly Algorithm
+        self.optimizer = None
         self.current_line = None
 
     def load_image(self):
@@ -147,6 +88,7 @@ class ImageEditorApp:
             self.canvas.config(width=self.image.width, height=self.image.height)
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
             self.drawings.clear()
+            self.fitness_model = None
             self.swarm.clear()
 
     def start_drawing(self, event):
@@ -154,6 +96,7 @@ class ImageEditorApp:
         self.current_line = [(x, y)]
         point = self.canvas.create_oval(x-2, y-2, x+2, y+2, fill="red", outline="red")
         self.drawings.append(("point", (x, y)))
+        self.fitness_model = None
 
     def draw_line(self, event):
         if self.current_line:
@@ -165,34 +108,25 @@ class ImageEditorApp:
     def end_drawing(self, event):
         if self.current_line and len(self.current_line) > 1:
             self.drawings.append(("line", self.current_line))
+            self.fitness_model = None
         self.current_line = None
 
     def clear_drawing(self):
         for item in self.canvas.find_all():
             self.canvas.delete(item)
         self.drawings.clear()
+        self.fitness_model = None
         self.swarm.clear()
 
     def calculate_fitness(self, particle_pos):
-        fitness = 0
-        for shape, coords in self.drawings:
-            if shape == "point":
-                px, py = coords
-                fitness += np.linalg.norm(np.array(particle_pos) - np.array([px, py]))
-            elif shape == "line":
-                for i in range(len(coords) - 1):
-                    x1, y1 = coords[i]
-                    x2, y2 = coords[i + 1]
-                    line_vec = np.array([x2 - x1, y2 - y1])
-                    point_vec = np.array(particle_pos) - np.array([x1, y1])
-                    line_len = np.linalg.norm(line_vec)
-                    if line_len > 0:
-                        line_unit_vec = line_vec / line_len
-                        proj_length = np.dot(point_vec, line_unit_vec)
-                        proj_length = max(0, min(line_len, proj_length))
-                        closest_point = np.array([x1, y1]) + proj_length * line_unit_vec
-                        fitness += np.linalg.norm(particle_pos - closest_point)
-        return fitness
+        # Accepts a single (2,) position or an (N, 2) batch
+        if self.fitness_model is None:
+            self.fitness_model = DrawingFitness(self.drawings)
+        if self.field_lookup_var.get():
+            # Rasterized once per drawing, then sampled bilinearly
+            field = self.fitness_model.distance_field(self.image.width, self.image.height)
+            return field(particle_pos)
+        return self.fitness_model(particle_pos)
 
     def run_simulation(self):
         try:
@@ -214,16 +148,21 @@ class ImageEditorApp:
             messagebox.showerror("Error", "Please load an image before running the simulation.")
             return
 
-        def objective_function(x):
-            return self.calculate_fitness(x)
-
-        bounds = np.array([[0, self.image.width - 1], [0, self.image.height - 1]])
-        kernel = RBFKernel(length_scale=1.0)
-        optimizer = DragonflyOptimizer(objective_function, bounds, kernel, acquisition_function="UCB", noise=1e-5)
-        best_point, best_value = optimizer.optimize(num_iterations=iterations, swarm_size=swarm_size)
+        bounds = image_bounds(self.image.width, self.image.height)
+        # Pixel-scale length scales; pass fit_every to refit them by marginal likelihood
+        kernel = RBFKernel(length_scale=[self.image.width / 10, self.image.height / 10])
+        gp_mode, sparse_method = GP_MODES[self.gp_mode_selector.get()]
+        self.optimizer = DragonflyOptimizer(self.calculate_fitness, bounds, swarm_size, kernel=kernel,
+                                            acquisition_function=self.acquisition_selector.get(), noise=1e-5,
+                                            gp_mode=gp_mode, sparse_method=sparse_method)
+        best_point, best_value = self.optimizer.run(iterations, callback=self.show_swarm)
 
         print(f"Best found point: {best_point}")
         print(f"Best found value: {best_value}")
+        if gp_mode != "exact":
+            error = self.optimizer.approximation_error(count=1000, rng=0)
+            print(f"GP approximation error: mean RMSE {error['mean_rmse']:.4g}, "
+                  f"std RMSE {error['std_rmse']:.4g}")
 
         # Visualize the best point
         x, y = best_point
@@ -231,6 +170,21 @@ class ImageEditorApp:
         self.swarm.append(dot)
         self.root.update()
 
+    def show_swarm(self, optimizer):
+        # Visualize the swarm particles
+        self.clear_swarm()
+        for x, y in optimizer.positions:
+            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
+            self.swarm.append(dot)
+        self.root.update()
+
+        print(f"Iteration: {optimizer.iteration}, Best value: {optimizer.last_value} at {optimizer.last_position}")
+        time.sleep(0.1)  # Pause for visualization
+
+    def clear_swarm(self):
+        for dot in self.swarm:
+            self.canvas.delete(dot)
+        self.swarm.clear()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import DrawingFitness, FireflyOptimizer, image_bounds
+
 class ImageEditorApp:
     def __init__(self, root):
         self.root = root
@@ -18,6 +19,7 @@ class ImageEditorApp:
         self.image = None
         self.image_tk = None
         self.drawings = []  # List of drawn items
+        self.fitness_model = None  # Drawings packed for batched fitness
         self.swarm = []  # Firefly visuals
         
         # Buttons and inputs
@@ -38,12 +40,20 @@ class ImageEditorApp:
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.field_lookup_var = tk.BooleanVar()
+        self.field_lookup_checkbox = tk.Checkbutton(self.toolbar, text="Precompute Field", variable=self.field_lookup_var)
+        self.field_lookup_checkbox.pack(side=tk.LEFT, padx=5)
+
+        self.neighbor_limited_var = tk.BooleanVar()
+        self.neighbor_limited_checkbox = tk.Checkbutton(self.toolbar, text="Neighbor Limited", variable=self.neighbor_limited_var)
+        self.neighbor_limited_checkbox.pack(side=tk.LEFT, padx=5)
+
         # Event bindings
         self.canvas.bind("<Button-1>", self.start_drawing)
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
-        self.fireflies = []
+        self.optimizer = None
 
     def load_image(self):
         file_path = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg *.jpeg *.png *.bmp")])
@@ -53,12 +63,14 @@ class ImageEditorApp:
             self.canvas.config(width=self.image.width, height=self.image.height)
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
             self.drawings.clear()
+            self.fitness_model = None
             self.swarm.clear()
 
     def start_drawing(self, event):
         x, y = event.x, event.y
         point = self.canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="red", outline="red")
         self.drawings.append(("point", (x, y)))
+        self.fitness_model = None
 
     def draw_line(self, event):
         if self.drawings and self.drawings[-1][0] == "point":
@@ -66,6 +78,7 @@ class ImageEditorApp:
             x, y = event.x, event.y
             self.canvas.create_line(last_point[0], last_point[1], x, y, fill="red")
             self.drawings.append(("line", [(last_point[0], last_point[1]), (x, y)]))
+            self.fitness_model = None
 
     def end_drawing(self, event):
         pass
@@ -74,28 +87,18 @@ class ImageEditorApp:
         for item in self.canvas.find_all():
             self.canvas.delete(item)
         self.drawings.clear()
+        self.fitness_model = None
         self.swarm.clear()
 
     def calculate_fitness(self, position):
-        fitness = 0
-        for shape, coords in self.drawings:
-            if shape == "point":
-                px, py = coords
-                fitness += np.linalg.norm(np.array(position) - np.array([px, py]))
-            elif shape == "line":
-                for i in range(len(coords) - 1):
-                    x1, y1 = coords[i]
-                    x2, y2 = coords[i + 1]
-                    line_vec = np.array([x2 - x1, y2 - y1])
-                    point_vec = np.array(position) - np.array([x1, y1])
-                    line_len = np.linalg.norm(line_vec)
-                    if line_len > 0:
-                        line_unit_vec = line_vec / line_len
-                        proj_length = np.dot(point_vec, line_unit_vec)
-                        proj_length = max(0, min(line_len, proj_length))
-                        closest_point = np.array([x1, y1]) + proj_length * line_unit_vec
-                        fitness += np.linalg.norm(position - closest_point)
-        return fitness
+        # Accepts a single (2,) position or an (N, 2) batch
+        if self.fitness_model is None:
+            self.fitness_model = DrawingFitness(self.drawings)
+        if self.field_lookup_var.get():
+            # Rasterized once per drawing, then sampled bilinearly
+            field = self.fitness_model.distance_field(self.image.width, self.image.height)
+            return field(position)
+        return self.fitness_model(position)
 
     def run_simulation(self):
         try:
@@ -112,44 +115,19 @@ class ImageEditorApp:
         self.run_fa(swarm_size, iterations)
 
     def run_fa(self, swarm_size, iterations):
-        # Initialize fireflies
-        self.fireflies = [
-            {
-                "position": np.array([
-                    np.random.randint(0, self.image.width),
-                    np.random.randint(0, self.image.height)
-                ], dtype=np.float64),
-                "brightness": float("inf")
-            }
-            for _ in range(swarm_size)
-        ]
-
-        gamma = 1.0  # Light absorption coefficient
-        alpha = 20.0  # Randomness coefficient
-
-        for iteration in range(iterations):
-            for i, firefly_i in enumerate(self.fireflies):
-                firefly_i["brightness"] = 1.0 / (1.0 + self.calculate_fitness(firefly_i["position"]))
-
-                for j, firefly_j in enumerate(self.fireflies):
-                    if firefly_j["brightness"] > firefly_i["brightness"]:
-                        distance = np.linalg.norm(firefly_i["position"] - firefly_j["position"])
-                        beta = np.exp(-gamma * distance**2)
-                        attraction = beta * (firefly_j["position"] - firefly_i["position"])
-                        randomness = alpha * (np.random.uniform(-1, 1, 2))
-                        firefly_i["position"] += attraction + randomness
-
-                        # Constrain within image bounds
-                        firefly_i["position"] = np.clip(firefly_i["position"], [0, 0], [self.image.width - 1, self.image.height - 1])
-
-            # Visualize fireflies
-            self.clear_swarm()
-            for firefly in self.fireflies:
-                x, y = firefly["position"]
-                dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
-                self.swarm.append(dot)
-            self.root.update()
-            time.sleep(0.1)  # Pause for visualization
+        bounds = image_bounds(self.image.width, self.image.height)
+        self.optimizer = FireflyOptimizer(self.calculate_fitness, bounds, swarm_size, gamma=1.0, alpha=20.0,
+                                          neighbor_limited=self.neighbor_limited_var.get())
+        self.optimizer.run(iterations, callback=self.show_swarm)
+
+    def show_swarm(self, optimizer):
+        # Visualize fireflies after each iteration
+        self.clear_swarm()
+        for x, y in optimizer.positions:
+            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
+            self.swarm.append(dot)
+        self.root.update()
+        time.sleep(0.1)  # Pause for visualization
 
     def clear_swarm(self):
         for dot in self.swarm:
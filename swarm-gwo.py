@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import DrawingFitness, GreyWolfOptimizer, image_bounds
+
 class ImageEditorApp:
     def __init__(self, root):
         self.root = root
@@ -18,6 +19,7 @@ class ImageEditorApp:
         self.image = None
         self.image_tk = None
         self.drawings = []  # List of drawn items (points and lines)
+        self.fitness_model = None  # Drawings packed for batched fitness
         self.swarm = []  # Grey Wolf visualizations
 
         # Buttons and inputs
@@ -38,12 +40,16 @@ class ImageEditorApp:
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.field_lookup_var = tk.BooleanVar()
+        self.field_lookup_checkbox = tk.Checkbutton(self.toolbar, text="Precompute Field", variable=self.field_lookup_var)
+        self.field_lookup_checkbox.pack(side=tk.LEFT, padx=5)
+
         # Event bindings for drawing
         self.canvas.bind("<Button-1>", self.start_drawing)
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
-        self.wolves = []
+        self.optimizer = None
         self.current_line = None
 
     def load_image(self):
@@ -54,6 +60,7 @@ class ImageEditorApp:
             self.canvas.config(width=self.image.width, height=self.image.height)
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
             self.drawings.clear()
+            self.fitness_model = None
             self.swarm.clear()
 
     def start_drawing(self, event):
@@ -61,6 +68,7 @@ class ImageEditorApp:
         self.current_line = [(x, y)]
         point = self.canvas.create_oval(x-2, y-2, x+2, y+2, fill="red", outline="red")
         self.drawings.append(("point", (x, y)))
+        self.fitness_model = None
 
     def draw_line(self, event):
         if self.current_line:
@@ -72,38 +80,25 @@ class ImageEditorApp:
     def end_drawing(self, event):
         if self.current_line and len(self.current_line) > 1:
             self.drawings.append(("line", self.current_line))
+            self.fitness_model = None
         self.current_line = None
 
     def clear_drawing(self):
         for item in self.canvas.find_all():
             self.canvas.delete(item)
         self.drawings.clear()
+        self.fitness_model = None
         self.swarm.clear()
 
     def calculate_fitness(self, position):
-        fitness = 0
-        # Iterate over the shapes (points and lines) in the drawings list
-        for shape, coords in self.drawings:
-            if shape == "point":
-                px, py = coords
-                distance = np.linalg.norm(np.array(position) - np.array([px, py]))
-                fitness += distance
-            elif shape == "line":
-                # For each line segment, calculate the fitness based on the nearest point on the line
-                for i in range(len(coords) - 1):
-                    x1, y1 = coords[i]
-                    x2, y2 = coords[i + 1]
-                    line_vec = np.array([x2 - x1, y2 - y1])
-                    point_vec = np.array(position) - np.array([x1, y1])
-                    line_len = np.linalg.norm(line_vec)
-                    if line_len > 0:
-                        line_unit_vec = line_vec / line_len
-                        proj_length = np.dot(point_vec, line_unit_vec)
-                        proj_length = max(0, min(line_len, proj_length))
-                        closest_point = np.array([x1, y1]) + proj_length * line_unit_vec
-                        distance = np.linalg.norm(position - closest_point)
-                        fitness += distance / (len(coords) - 1)
-        return fitness
+        # Accepts a single (2,) position or an (N, 2) batch
+        if self.fitness_model is None:
+            self.fitness_model = DrawingFitness(self.drawings, normalize_lines=True)
+        if self.field_lookup_var.get():
+            # Rasterized once per drawing, then sampled bilinearly
+            field = self.fitness_model.distance_field(self.image.width, self.image.height)
+            return field(position)
+        return self.fitness_model(position)
 
     def run_simulation(self):
         try:
@@ -120,69 +115,30 @@ class ImageEditorApp:
         self.run_gwo(swarm_size, iterations)
 
     def run_gwo(self, swarm_size, iterations):
-        # Initialize Wolves with random positions
-        self.wolves = [
-            {
-                "position": np.array([
-                    np.random.randint(0, self.image.width),
-                    np.random.randint(0, self.image.height)
-                ], dtype=np.float64),
-                "fitness": float("inf")
-            }
-            for _ in range(swarm_size)
-        ]
-
-        for iteration in range(iterations):
-            # Sort wolves by fitness (best wolf has lowest fitness)
-            for wolf in self.wolves:
-                wolf["fitness"] = self.calculate_fitness(wolf["position"])
-            self.wolves.sort(key=lambda wolf: wolf["fitness"])
-
-            # Get the positions of the best wolves (alpha, beta, delta)
-            alpha_wolf = self.wolves[0]
-            beta_wolf = self.wolves[1]
-            delta_wolf = self.wolves[2]
-
-            # Update positions of all wolves based on GWO equations
-            for wolf in self.wolves:
-                a = 2 - iteration * (2 / iterations)  # Linearly decreasing parameter
-
-                # Update position using alpha, beta, and delta wolves
-                for i in range(2):  # 2D space (x, y)
-                    r1, r2 = np.random.rand(), np.random.rand()
-                    A1, A2, A3 = 2 * a * r1 - a, 2 * a * r2 - a, 2 * a * r1 - a
-                    C1, C2, C3 = 2 * r1, 2 * r2, 2 * r1
-                    D_alpha = np.abs(C1 * alpha_wolf["position"][i] - wolf["position"][i])
-                    D_beta = np.abs(C2 * beta_wolf["position"][i] - wolf["position"][i])
-                    D_delta = np.abs(C3 * delta_wolf["position"][i] - wolf["position"][i])
-
-                    wolf["position"][i] = alpha_wolf["position"][i] - A1 * D_alpha
-                    wolf["position"][i] = beta_wolf["position"][i] - A2 * D_beta
-                    wolf["position"][i] = delta_wolf["position"][i] - A3 * D_delta
-
-                # Clip wolf positions within the image bounds
-                wolf["position"] = np.clip(wolf["position"], [0, 0], [self.image.width - 1, self.image.height - 1])
-
-            # Visualization of Wolves
-            self.clear_swarm()
-            for wolf in self.wolves:
-                x, y = wolf["position"]
-                dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
-                self.swarm.append(dot)
-
-            # Visualization of Drawn Points and Lines
-            for shape, coords in self.drawings:
-                if shape == "point":
-                    px, py = coords
-                    self.canvas.create_oval(px-2, py-2, px+2, py+2, fill="red", outline="red")
-                elif shape == "line":
-                    for i in range(len(coords) - 1):
-                        x1, y1 = coords[i]
-                        x2, y2 = coords[i + 1]
-                        self.canvas.create_line(x1, y1, x2, y2, fill="red")
-
-            self.root.update()
-            time.sleep(0.1)  # Pause for visualization
+        bounds = image_bounds(self.image.width, self.image.height)
+        self.optimizer = GreyWolfOptimizer(self.calculate_fitness, bounds, swarm_size)
+        self.optimizer.run(iterations, callback=self.show_swarm)
+
+    def show_swarm(self, optimizer):
+        # Visualization of Wolves
+        self.clear_swarm()
+        for x, y in optimizer.positions:
+            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
+            self.swarm.append(dot)
+
+        # Visualization of Drawn Points and Lines
+        for shape, coords in self.drawings:
+            if shape == "point":
+                px, py = coords
+                self.canvas.create_oval(px-2, py-2, px+2, py+2, fill="red", outline="red")
+            elif shape == "line":
+                for i in range(len(coords) - 1):
+                    x1, y1 = coords[i]
+                    x2, y2 = coords[i + 1]
+                    self.canvas.create_line(x1, y1, x2, y2, fill="red")
+
+        self.root.update()
+        time.sleep(0.1)  # Pause for visualization
 
     def clear_swarm(self):
         for dot in self.swarm:
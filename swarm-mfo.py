@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-import numpy as np
 import time
 
+from swarm_core import DrawingFitness, MothFlameOptimizer, image_bounds
+
 class ImageEditorApp:
     def __init__(self, root):
         self.root = root
@@ -18,6 +19,7 @@ class ImageEditorApp:
         self.image = None
         self.image_tk = None
         self.drawings = []  # List of drawn items
+        self.fitness_model = None  # Drawings packed for batched fitness
         self.swarm = []  # Moth visualizations
 
         # Buttons and inputs
@@ -38,12 +40,16 @@ class ImageEditorApp:
         self.run_button = tk.Button(self.toolbar, text="Run Simulation", command=self.run_simulation)
         self.run_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.field_lookup_var = tk.BooleanVar()
+        self.field_lookup_checkbox = tk.Checkbutton(self.toolbar, text="Precompute Field", variable=self.field_lookup_var)
+        self.field_lookup_checkbox.pack(side=tk.LEFT, padx=5)
+
         # Event bindings
         self.canvas.bind("<Button-1>", self.start_drawing)
         self.canvas.bind("<B1-Motion>", self.draw_line)
         self.canvas.bind("<ButtonRelease-1>", self.end_drawing)
 
-        self.moths = []
+        self.optimizer = None
         self.current_line = None
 
     def load_image(self):
@@ -54,6 +60,7 @@ class ImageEditorApp:
             self.canvas.config(width=self.image.width, height=self.image.height)
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
             self.drawings.clear()
+            self.fitness_model = None
             self.swarm.clear()
 
     def start_drawing(self, event):
@@ -61,6 +68,7 @@ class ImageEditorApp:
         self.current_line = [(x, y)]
         point = self.canvas.create_oval(x-2, y-2, x+2, y+2, fill="red", outline="red")
         self.drawings.append(("point", (x, y)))
+        self.fitness_model = None
 
     def draw_line(self, event):
         if self.current_line:
@@ -72,36 +80,25 @@ class ImageEditorApp:
     def end_drawing(self, event):
         if self.current_line and len(self.current_line) > 1:
             self.drawings.append(("line", self.current_line))
+            self.fitness_model = None
         self.current_line = None
 
     def clear_drawing(self):
         for item in self.canvas.find_all():
             self.canvas.delete(item)
         self.drawings.clear()
+        self.fitness_model = None
         self.swarm.clear()
 
     def calculate_fitness(self, position):
-        fitness = 0
-        for shape, coords in self.drawings:
-            if shape == "point":
-                px, py = coords
-                distance = np.linalg.norm(np.array(position) - np.array([px, py]))
-                fitness += distance
-            elif shape == "line":
-                for i in range(len(coords) - 1):
-                    x1, y1 = coords[i]
-                    x2, y2 = coords[i + 1]
-                    line_vec = np.array([x2 - x1, y2 - y1])
-                    point_vec = np.array(position) - np.array([x1, y1])
-                    line_len = np.linalg.norm(line_vec)
-                    if line_len > 0:
-                        line_unit_vec = line_vec / line_len
-                        proj_length = np.dot(point_vec, line_unit_vec)
-                        proj_length = max(0, min(line_len, proj_length))
-                        closest_point = np.array([x1, y1]) + proj_length * line_unit_vec
-                        distance = np.linalg.norm(position - closest_point)
-                        fitness += distance / (len(coords) - 1)
-        return fitness
+        # Accepts a single (2,) position or an (N, 2) batch
+        if self.fitness_model is None:
+            self.fitness_model = DrawingFitness(self.drawings, normalize_lines=True)
+        if self.field_lookup_var.get():
+            # Rasterized once per drawing, then sampled bilinearly
+            field = self.fitness_model.distance_field(self.image.width, self.image.height)
+            return field(position)
+        return self.fitness_model(position)
 
     def run_simulation(self):
         try:
@@ -118,55 +115,18 @@ class ImageEditorApp:
         self.run_mfo(swarm_size, iterations)
 
     def run_mfo(self, swarm_size, iterations):
-        # Initialize Moths with random positions
-        self.moths = [
-            {
-                "position": np.array([
-                    np.random.randint(0, self.image.width),
-                    np.random.randint(0, self.image.height)
-                ], dtype=np.float64),
-                "fitness": float("inf"),
-                "flame_position": np.array([
-                    np.random.randint(0, self.image.width),
-                    np.random.randint(0, self.image.height)
-                ], dtype=np.float64)
-            }
-            for _ in range(swarm_size)
-        ]
-
-        for iteration in range(iterations):
-            # Evaluate fitness of each moth
-            for moth in self.moths:
-                moth["fitness"] = self.calculate_fitness(moth["position"])
-
-            # Sort moths by fitness (best moth has lowest fitness)
-            self.moths.sort(key=lambda moth: moth["fitness"])
-
-            # Update flame positions (best moth moves to the flame)
-            for i, moth in enumerate(self.moths):
-                flame = self.moths[0]["position"]  # The flame is the best moth's position
-                distance = np.linalg.norm(moth["position"] - flame)
-                
-                # Spiral movement around the flame
-                spiral_factor = np.random.uniform(0, 1)
-                spiral_position = moth["position"] + (spiral_factor * (flame - moth["position"]))
-
-                # Apply randomization (moth randomness)
-                randomness = np.random.uniform(-1, 1, 2)
-                moth["position"] = spiral_position + randomness
-
-                # Clip moth positions within the image bounds
-                moth["position"] = np.clip(moth["position"], [0, 0], [self.image.width - 1, self.image.height - 1])
-
-            # Visualization of Moths
-            self.clear_swarm()
-            for moth in self.moths:
-                x, y = moth["position"]
-                dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
-                self.swarm.append(dot)
-
-            self.root.update()
-            time.sleep(0.1)  # Pause for visualization
+        bounds = image_bounds(self.image.width, self.image.height)
+        self.optimizer = MothFlameOptimizer(self.calculate_fitness, bounds, swarm_size)
+        self.optimizer.run(iterations, callback=self.show_swarm)
+
+    def show_swarm(self, optimizer):
+        # Visualize moths after each iteration
+        self.clear_swarm()
+        for x, y in optimizer.positions:
+            dot = self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5, fill="green", outline="green")
+            self.swarm.append(dot)
+        self.root.update()
+        time.sleep(0.1)  # Pause for visualization
 
     def clear_swarm(self):
         for dot in self.swarm:
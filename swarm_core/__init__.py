@@ -0,0 +1,52 @@
+"""Shared numerical core for the swarm algorithm demos.
+
+Everything in this package is headless: optimizers expose ``step()`` and
+``run(iterations, callback=None)`` over NumPy state, and the Tk demos only
+observe them through the callback.
+"""
+
+from .ant import AntColonyOptimizer
+from .base import SwarmOptimizer, image_bounds
+from .bco import BeeColonyOptimizer
+from .cs import CuckooSearchOptimizer
+from .da import DragonflyOptimizer, GaussianProcess, RBFKernel, SlidingWindowGP, SparseGP, approximation_error
+from .fa import FireflyOptimizer
+from .fitness import DistanceField, DrawingFitness
+from .gwo import GreyWolfOptimizer
+from .mfo import MothFlameOptimizer
+from .pso import ParticleSwarmOptimizer
+from .raster import RasterView, open_raster
+from .ssa import SalpSwarmOptimizer
+from .state import PathHistory, SwarmState
+from .terrain import ExtremaSet, HeightField, PyramidTerrainOptimizer, TerrainOptimizer
+from .woa import WhaleOptimizer
+
+__all__ = [
+    "AntColonyOptimizer",
+    "BeeColonyOptimizer",
+    "CuckooSearchOptimizer",
+    "DistanceField",
+    "DragonflyOptimizer",
+    "DrawingFitness",
+    "ExtremaSet",
+    "FireflyOptimizer",
+    "GaussianProcess",
+    "GreyWolfOptimizer",
+    "HeightField",
+    "MothFlameOptimizer",
+    "PathHistory",
+    "ParticleSwarmOptimizer",
+    "PyramidTerrainOptimizer",
+    "RBFKernel",
+    "RasterView",
+    "SalpSwarmOptimizer",
+    "SlidingWindowGP",
+    "SparseGP",
+    "SwarmOptimizer",
+    "SwarmState",
+    "TerrainOptimizer",
+    "WhaleOptimizer",
+    "approximation_error",
+    "image_bounds",
+    "open_raster",
+]
@@ -0,0 +1,379 @@
+"""Ant Colony Optimization for closed tours through a set of points."""
+
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def distance_matrix(points):
+    diff = points[:, None, :] - points[None, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+
+def nearest_neighbors(distances, count):
+    # For every city, the ``count`` closest other cities, nearest first
+    count = min(count, len(distances) - 1)
+    masked = distances + np.diag(np.full(len(distances), np.inf))
+    nearest = np.argpartition(masked, count - 1, axis=1)[:, :count]
+    order = np.argsort(np.take_along_axis(masked, nearest, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(nearest, order, axis=1)
+
+
+def roulette(weights, rng):
+    # One index per row, drawn in proportion to that row's weights
+    cumulative = np.cumsum(weights, axis=1)
+    threshold = rng.random((len(weights), 1)) * cumulative[:, -1:]
+    return np.minimum((cumulative <= threshold).sum(axis=1), weights.shape[1] - 1)
+
+
+def construct_tours(choice, starts, rng, candidates=None):
+    """Build one tour per entry of ``starts`` on the ``choice`` matrix.
+
+    ``choice[i, j]`` is the (unnormalized) desirability of moving from i to
+    j.  All ants advance together, one city per step, with visited cities
+    masked out.  With ``candidates`` an ant first picks among its current
+    city's unvisited nearest neighbours and only falls back to the most
+    desirable unvisited city when they are all taken.
+    """
+    ant_count, num_points = len(starts), len(choice)
+    ants = np.arange(ant_count)
+    tours = np.empty((ant_count, num_points), dtype=np.intp)
+    visited = np.zeros((ant_count, num_points), dtype=bool)
+    tours[:, 0] = starts
+    visited[ants, starts] = True
+
+    for step in range(1, num_points):
+        current = tours[:, step - 1]
+        if candidates is None:
+            weights = choice[current] * ~visited
+            nxt = roulette(weights, rng)
+        else:
+            options = candidates[current]
+            weights = choice[current[:, None], options] * ~visited[ants[:, None], options]
+            nxt = options[ants, roulette(weights, rng)]
+            exhausted = weights.sum(axis=1) == 0
+            if exhausted.any():
+                fallback = np.where(visited[exhausted], -np.inf, choice[current[exhausted]])
+                nxt[exhausted] = np.argmax(fallback, axis=1)
+
+        # Rows with no weight left (e.g. zero pheromone) pick any unvisited city
+        stuck = visited[ants, nxt]
+        if stuck.any():
+            nxt[stuck] = roulette((~visited[stuck]).astype(np.float64), rng)
+        tours[:, step] = nxt
+        visited[ants, nxt] = True
+    return tours
+
+
+def _reverse(tour, position, start, end):
+    # Reverse tour[start..end] (cyclic, inclusive).  Reversing the shorter
+    # of the segment and its complement gives the same cycle.
+    n = len(tour)
+    length = (end - start) % n + 1
+    if 2 * length > n:
+        start, end, length = (end + 1) % n, (start - 1) % n, n - length
+    index = (start + np.arange(length)) % n
+    tour[index] = tour[index[::-1]]
+    position[tour[index]] = index
+
+
+def two_opt(tour, distances, neighbors, tolerance=1e-9):
+    """Improve a closed tour with neighbour-list 2-opt and don't-look bits.
+
+    For every city a only the edges towards its nearest ``neighbors``
+    shorter than a's current tour edge are tried, and a city is looked at
+    again only when one of its tour edges has changed, so a pass costs
+    roughly O(n * len(neighbors[0])) rather than O(n^2).
+    """
+    tour = np.array(tour, dtype=np.intp)
+    n = len(tour)
+    if n < 4:
+        return tour
+    position = np.empty(n, dtype=np.intp)
+    position[tour] = np.arange(n)
+    queue = deque(tour.tolist())
+    active = np.ones(n, dtype=bool)  # Inverse of the don't-look bit
+
+    while queue:
+        a = queue.popleft()
+        active[a] = False
+        for step in (1, -1):
+            # step=1 swaps edges (a, succ a) and (c, succ c); step=-1 the predecessors
+            i = position[a]
+            b = tour[(i + step) % n]
+            d_ab = distances[a, b]
+            moved = None
+            for c in neighbors[a]:
+                d_ac = distances[a, c]
+                if d_ac >= d_ab:
+                    break
+                j = position[c]
+                d = tour[(j + step) % n]
+                if c == b or d == a:
+                    continue
+                if d_ac + distances[b, d] < d_ab + distances[c, d] - tolerance:
+                    moved = (b, c, d)
+                    if step == 1:
+                        _reverse(tour, position, (i + 1) % n, j)
+                    else:
+                        _reverse(tour, position, i, (j - 1) % n)
+                    break
+            if moved is not None:
+                for city in (a, *moved):
+                    if not active[city]:
+                        active[city] = True
+                        queue.append(city)
+                break
+    return tour
+
+
+def or_opt(tour, distances, neighbors, max_segment=3, tolerance=1e-9):
+    """Move segments of up to ``max_segment`` cities to a better place.
+
+    A segment starting at city s is only reinserted next to one of s's
+    nearest ``neighbors``, either way round, with the same don't-look
+    bits as :func:`two_opt`.
+    """
+    tour = np.array(tour, dtype=np.intp)
+    n = len(tour)
+    if n < 5:
+        return tour
+    position = np.empty(n, dtype=np.intp)
+    position[tour] = np.arange(n)
+    queue = deque(tour.tolist())
+    active = np.ones(n, dtype=bool)
+
+    while queue:
+        s = queue.popleft()
+        active[s] = False
+        i = position[s]
+        prev = tour[(i - 1) % n]
+        for length in range(1, min(max_segment, n - 3) + 1):
+            segment = tour[(i + np.arange(length)) % n]
+            last = segment[-1]
+            nxt = tour[(i + length) % n]
+            removed = distances[prev, s] + distances[last, nxt] - distances[prev, nxt]
+            best = None
+            for c in neighbors[s]:
+                if distances[s, c] >= removed:
+                    break
+                if (position[c] - i) % n < length:
+                    continue
+                # Either c, s..last, succ c  or  pred c, last..s, c
+                j = position[c]
+                for e, reverse in ((tour[(j + 1) % n], False), (tour[(j - 1) % n], True)):
+                    if (position[e] - i) % n < length:
+                        continue
+                    if reverse:
+                        added = distances[e, last] + distances[s, c] - distances[e, c]
+                    else:
+                        added = distances[c, s] + distances[last, e] - distances[c, e]
+                    gain = removed - added
+                    if gain > tolerance and (best is None or gain > best[0]):
+                        best = (gain, e if reverse else c, reverse)
+            if best is None:
+                continue
+
+            _, after, reverse = best
+            rest = np.roll(tour, -i)[length:]
+            cut = int(np.flatnonzero(rest == after)[0]) + 1
+            tour = np.concatenate([rest[:cut], segment[::-1] if reverse else segment, rest[cut:]])
+            position[tour] = np.arange(n)
+            for city in (prev, nxt, s, last, *rest[cut - 1:cut + 1]):
+                if not active[city]:
+                    active[city] = True
+                    queue.append(city)
+            break
+    return tour
+
+
+def local_search(tour, distances, neighbors, max_rounds=10):
+    # Alternate 2-opt and Or-opt until neither shortens the tour
+    tour = np.asarray(tour, dtype=np.intp)
+    length = tour_length(tour, distances)
+    for _ in range(max_rounds):
+        tour = or_opt(two_opt(tour, distances, neighbors), distances, neighbors)
+        improved = tour_length(tour, distances)
+        if improved >= length - 1e-9:
+            break
+        length = improved
+    return tour
+
+
+def tour_length(tour, distances):
+    return float(distances[tour, np.roll(tour, -1)].sum())
+
+
+# Per-process view of the shared choice matrix, set up by _attach_worker
+_worker_choice = None
+_worker_candidates = None
+_worker_memory = None
+
+
+def _attach_worker(name, shape, candidates):
+    global _worker_choice, _worker_candidates, _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_choice = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+    _worker_candidates = candidates
+
+
+def construct_block(choice, candidates, count, seed):
+    # A block of ants drawing starts and moves from its own random stream
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(len(choice), size=count)
+    return construct_tours(choice, starts, rng, candidates)
+
+
+def _construct_block(count, seed):
+    return construct_block(_worker_choice, _worker_candidates, count, seed)
+
+
+def _release(executor, memory):
+    if executor is not None:
+        executor.shutdown()
+    if memory is not None:
+        memory.close()
+        memory.unlink()
+
+
+class AntColonyOptimizer:
+    def __init__(self, points, ant_count, alpha=1.0, beta=1.0, evaporation=0.9, candidate_count=None,
+                 workers=None, ant_block=64, local_search=None, neighbor_count=10, seed=None):
+        # alpha and beta weight pheromone against the 1/distance heuristic;
+        # candidate_count restricts each move to that many nearest neighbours.
+        # local_search is None, "all" (2-opt + Or-opt on every ant's tour) or
+        # "best" (only the iteration-best tour), with neighbor_count nearest
+        # neighbours per city bounding each local-search pass.
+        # Ants are built in blocks of ant_block, each with its own random
+        # stream derived from the seed, the iteration and the block index, so
+        # the tours are identical whatever the number of workers.
+        self.points = np.asarray(points, dtype=np.float64)
+        self.ant_count = ant_count
+        self.alpha = alpha
+        self.beta = beta
+        self.evaporation = evaporation  # Fraction of pheromone kept each iteration
+        self.workers = workers
+        self.ant_block = ant_block
+        self.seed_sequence = np.random.SeedSequence(seed)
+        if local_search not in (None, "all", "best"):
+            raise ValueError(f"Unknown local search mode: {local_search!r}")
+        self.local_search = local_search
+
+        self.distances = distance_matrix(self.points)
+        with np.errstate(divide="ignore"):
+            self.heuristic = 1.0 / np.maximum(self.distances, 1e-12)
+        np.fill_diagonal(self.heuristic, 0)
+        self.candidates = None
+        if candidate_count is not None and self.num_points > 1:
+            self.candidates = nearest_neighbors(self.distances, candidate_count)
+        self.neighbors = None
+        if local_search is not None and self.num_points > 1:
+            self.neighbors = nearest_neighbors(self.distances, neighbor_count)
+
+        self.pheromones = np.ones((self.num_points, self.num_points))
+        self.iteration = 0
+        self.paths = None
+        self.path_lengths = None
+        self.best_path = None
+        self.best_length = float("inf")
+
+        self.executor = None
+        self.shared_choice = None
+        self._finalizer = None
+
+    @property
+    def num_points(self):
+        return len(self.points)
+
+    @property
+    def parallel(self):
+        return self.workers is not None and self.workers > 1
+
+    def block_seeds(self):
+        # (ant count, seed) per block; depends only on the seed and iteration
+        blocks = []
+        for block, lo in enumerate(range(0, self.ant_count, self.ant_block)):
+            seed = np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=(self.iteration, block))
+            blocks.append((min(self.ant_block, self.ant_count - lo), seed))
+        return blocks
+
+    def start_workers(self):
+        # One shared block for the choice matrix, reused for every iteration
+        size = self.num_points * self.num_points * np.dtype(np.float64).itemsize
+        memory = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self.shared_choice = np.ndarray((self.num_points, self.num_points), dtype=np.float64, buffer=memory.buf)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_worker,
+            initargs=(memory.name, self.shared_choice.shape, self.candidates),
+        )
+        self._finalizer = weakref.finalize(self, _release, self.executor, memory)
+
+    def close(self):
+        # Shut the worker pool down and free the shared matrix
+        if self._finalizer is not None:
+            self.shared_choice = None
+            self._finalizer()
+            self._finalizer = None
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def tour_lengths(self, tours):
+        return self.distances[tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+
+    def choice_matrix(self):
+        # Computed once per iteration and shared by every ant
+        return self.pheromones ** self.alpha * self.heuristic ** self.beta
+
+    def build_tours(self, choice):
+        blocks = self.block_seeds()
+        if not self.parallel:
+            return np.concatenate([construct_block(choice, self.candidates, count, seed) for count, seed in blocks])
+
+        if self.executor is None:
+            self.start_workers()
+        self.shared_choice[...] = choice
+        counts, seeds = zip(*blocks)
+        return np.concatenate(list(self.executor.map(_construct_block, counts, seeds)))
+
+    def improve_tours(self):
+        # Local search on the constructed tours before they deposit pheromone
+        if self.local_search == "all":
+            targets = range(len(self.paths))
+        else:
+            targets = [int(np.argmin(self.path_lengths))]
+        for ant in targets:
+            self.paths[ant] = local_search(self.paths[ant], self.distances, self.neighbors)
+        self.path_lengths[targets] = self.tour_lengths(self.paths[targets])
+
+    def step(self):
+        self.paths = self.build_tours(self.choice_matrix())
+        self.path_lengths = self.tour_lengths(self.paths)
+        if self.neighbors is not None:
+            self.improve_tours()
+
+        best = int(np.argmin(self.path_lengths))
+        if self.path_lengths[best] < self.best_length:
+            self.best_length = float(self.path_lengths[best])
+            self.best_path = self.paths[best].copy()
+
+        # Evaporate, then deposit in proportion to tour quality
+        self.pheromones *= self.evaporation
+        np.add.at(self.pheromones, (self.paths, np.roll(self.paths, -1, axis=1)),
+                  (1 / self.path_lengths)[:, None])
+
+    def run(self, iterations, callback=None):
+        for _ in range(iterations):
+            self.step()
+            self.iteration += 1
+            if callback is not None:
+                callback(self)
+        return self.best_path, self.best_length
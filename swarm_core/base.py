@@ -0,0 +1,92 @@
+"""Common step/run loop shared by the headless swarm optimizers."""
+
+import numpy as np
+
+from .state import SwarmState
+
+
+def image_bounds(width, height):
+    # Pixel coordinates are valid from 0 to size - 1 on each axis
+    return np.array([[0, width - 1], [0, height - 1]], dtype=np.float64)
+
+
+class SwarmOptimizer:
+    """Minimizes ``objective`` over ``bounds`` with a population of agents.
+
+    ``objective`` takes an ``(N, D)`` array of positions and returns ``(N,)``
+    fitness values.  Subclasses implement ``initialize`` and ``step``; ``run``
+    drives them and calls ``callback(optimizer)`` after every iteration so a
+    GUI can observe the swarm without the optimizer knowing about it.
+
+    To drive ``step()`` directly, call ``reset(iterations)`` first, which
+    sets the budget that schedules such as GWO's ``a`` depend on, and
+    advance ``iteration`` after each step as ``run`` does.
+    """
+
+    def __init__(self, objective, bounds, swarm_size, seed=None):
+        self.objective = objective
+        self.bounds = np.asarray(bounds, dtype=np.float64)
+        self.swarm_size = swarm_size
+        self.rng = np.random.default_rng(seed)
+
+        self.iteration = 0
+        self.iterations = None
+        self.state = None
+        self.best_position = None
+        self.best_value = float("inf")
+
+    @property
+    def dimensions(self):
+        return self.bounds.shape[0]
+
+    @property
+    def progress(self):
+        # Fraction of the iteration budget used, for decreasing schedules
+        if self.iterations is None:
+            raise ValueError("No iteration budget; call reset(iterations) or run() first")
+        return min(self.iteration, self.iterations) / self.iterations
+
+    @property
+    def positions(self):
+        return None if self.state is None else self.state.positions
+
+    def random_positions(self, count):
+        # Whole-pixel starting points, like the original demos
+        low = self.bounds[:, 0].astype(np.int64)
+        high = self.bounds[:, 1].astype(np.int64)
+        return self.rng.integers(low, high, size=(count, self.dimensions), endpoint=True).astype(np.float64)
+
+    def clip(self, positions, out=None):
+        return np.clip(positions, self.bounds[:, 0], self.bounds[:, 1], out=out)
+
+    def evaluate(self, positions):
+        return np.asarray(self.objective(np.atleast_2d(positions)), dtype=np.float64)
+
+    def record_best(self, position, value):
+        if value < self.best_value:
+            self.best_value = float(value)
+            self.best_position = np.array(position, dtype=np.float64)
+
+    def initialize(self):
+        self.state = SwarmState(self.swarm_size, self.dimensions)
+        self.state.positions[...] = self.random_positions(self.swarm_size)
+
+    def step(self):
+        raise NotImplementedError
+
+    def reset(self, iterations):
+        """Start a fresh swarm with a budget of ``iterations`` steps."""
+        self.iterations = iterations
+        self.iteration = 0
+        self.best_position = None
+        self.best_value = float("inf")
+        self.initialize()
+
+    def run(self, iterations, callback=None):
+        self.reset(iterations)
+        for _ in range(iterations):
+            self.step()
+            self.iteration += 1
+            if callback is not None:
+                callback(self)
+        return self.best_position, self.best_value
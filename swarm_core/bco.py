@@ -0,0 +1,81 @@
+"""Artificial Bee Colony."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+from .state import PathHistory
+
+
+class BeeColonyOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, step_range=(5.0, 10.0), trial_limit=10, path_length=50,
+                 seed=None):
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.step_range = step_range
+        self.trial_limit = trial_limit
+        self.path_length = path_length
+        self.trials = None
+        self.paths = None
+
+    def initialize(self):
+        super().initialize()
+        state = self.state
+        state.fitness[...] = self.evaluate(state.positions)
+        self.trials = np.zeros(self.swarm_size, dtype=np.int64)
+        self.paths = PathHistory(self.path_length, self.swarm_size, self.dimensions)
+
+    def neighbours(self, sources):
+        # One random step per candidate, its size drawn from step_range
+        step_size = self.rng.uniform(*self.step_range, size=(len(sources), 1))
+        candidates = self.state.positions[sources] + self.rng.uniform(-1, 1, (len(sources), self.dimensions)) * step_size
+        return self.clip(candidates, out=candidates)
+
+    def employed_phase(self):
+        # Every source gets one candidate; keep it if better, else count a trial
+        state = self.state
+        sources = np.arange(self.swarm_size)
+        candidates = self.neighbours(sources)
+        values = self.evaluate(candidates)
+        better = values < state.fitness
+        np.copyto(state.positions, candidates, where=better[:, None])
+        np.copyto(state.fitness, values, where=better)
+        self.trials = np.where(better, 0, self.trials + 1)
+
+    def onlooker_phase(self):
+        # Onlookers pick sources in proportion to quality (cumulative-sum sampling)
+        state = self.state
+        quality = 1.0 / (1.0 + state.fitness)
+        cumulative = np.cumsum(quality)
+        sources = np.searchsorted(cumulative, self.rng.random(self.swarm_size) * cumulative[-1], side="right")
+        sources = np.minimum(sources, self.swarm_size - 1)
+
+        candidates = self.neighbours(sources)
+        values = self.evaluate(candidates)
+
+        # Several onlookers may share a source; the best improving one wins
+        order = np.lexsort((values, sources))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sources[order][1:] != sources[order][:-1]
+        winners = order[first]
+        won = winners[values[winners] < state.fitness[sources[winners]]]
+
+        state.positions[sources[won]] = candidates[won]
+        state.fitness[sources[won]] = values[won]
+        self.trials[sources[won]] = 0
+
+    def scout_phase(self):
+        # Abandon sources that stopped improving and scout new ones at random
+        state = self.state
+        exhausted = np.flatnonzero(self.trials > self.trial_limit)
+        if len(exhausted):
+            state.positions[exhausted] = self.random_positions(len(exhausted))
+            state.fitness[exhausted] = self.evaluate(state.positions[exhausted])
+            self.trials[exhausted] = 0
+
+    def step(self):
+        self.paths.append(self.state.positions)
+        self.employed_phase()
+        self.onlooker_phase()
+        self.scout_phase()
+
+        best = self.state.best_index()
+        self.record_best(self.state.positions[best], self.state.fitness[best])
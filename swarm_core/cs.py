@@ -0,0 +1,63 @@
+"""Cuckoo Search with Lévy flights."""
+
+import functools
+import math
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+@functools.lru_cache(maxsize=None)
+def mantegna_sigma(alpha):
+    # Scale of the numerator normal in Mantegna's algorithm for Lévy steps
+    numerator = math.gamma(1 + alpha) * math.sin(math.pi * alpha / 2)
+    denominator = math.gamma((1 + alpha) / 2) * alpha * 2 ** ((alpha - 1) / 2)
+    return (numerator / denominator) ** (1 / alpha)
+
+
+class CuckooSearchOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, attraction=0.1, alpha=1.5, abandon_rate=0.25, seed=None):
+        # abandon_rate (pa) is the fraction of worst nests rebuilt each iteration
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.attraction = attraction
+        self.alpha = alpha
+        self.abandon_rate = abandon_rate
+
+    def initialize(self):
+        super().initialize()
+        state = self.state
+        state.fitness[...] = self.evaluate(state.positions)
+        best = state.best_index()
+        self.record_best(state.positions[best], state.fitness[best])
+
+    def levy_steps(self, count):
+        shape = (count, self.dimensions)
+        u = self.rng.normal(0, mantegna_sigma(self.alpha), shape)
+        v = self.rng.normal(0, 1, shape)
+        return u / np.abs(v) ** (1 / self.alpha)
+
+    def step(self):
+        state = self.state
+        positions, fitness = state.positions, state.fitness
+
+        # New eggs: move towards the best nest, then explore with a Lévy flight
+        eggs = positions + self.attraction * (self.best_position - positions)
+        eggs += self.levy_steps(self.swarm_size)
+        self.clip(eggs, out=eggs)
+        egg_fitness = self.evaluate(eggs)
+
+        # Keep an egg only where it beats the nest it was laid from
+        better = egg_fitness < fitness
+        np.copyto(positions, eggs, where=better[:, None])
+        np.copyto(fitness, egg_fitness, where=better)
+
+        # The host birds discover a fraction of the worst nests; rebuild them at random
+        abandoned = int(self.abandon_rate * self.swarm_size)
+        if abandoned:
+            worst = np.argpartition(fitness, self.swarm_size - abandoned)[self.swarm_size - abandoned:]
+            positions[worst] = self.random_positions(abandoned)
+            fitness[worst] = self.evaluate(positions[worst])
+
+        best = state.best_index()
+        self.record_best(positions[best], fitness[best])
@@ -0,0 +1,622 @@
+"""Dragonfly-style Bayesian optimizer driven by a Gaussian process."""
+
+import copy
+
+import numpy as np
+
+from .base import SwarmOptimizer
+from .state import SwarmState
+
+
+def _solve_lower(L, B, transpose=False):
+    # Triangular solve with the lower Cholesky factor, O(n^2) per column
+    from scipy.linalg import solve_triangular
+
+    return solve_triangular(L, B, lower=True, trans=1 if transpose else 0, check_finite=False)
+
+
+def _cholesky(K):
+    # Duplicate samples make kernel matrices only numerically PSD
+    jitter = 0.0
+    for _ in range(6):
+        try:
+            return np.linalg.cholesky(K + jitter * np.eye(len(K)))
+        except np.linalg.LinAlgError:
+            jitter = max(10 * jitter, 1e-10)
+    raise np.linalg.LinAlgError("Kernel matrix is not positive definite")
+
+
+def _cholesky_inverse(L):
+    # (L L^T)^-1 from the factor (LAPACK potri), without inverting L first
+    from scipy.linalg.lapack import dpotri
+
+    inverse, info = dpotri(L, lower=1)
+    if info != 0:
+        raise np.linalg.LinAlgError("Kernel matrix is singular")
+    return np.tril(inverse) + np.tril(inverse, -1).T
+
+
+def _cholesky_update(L, x):
+    # In-place rank-one update: afterwards L L^T equals the old L L^T + x x^T
+    x = x.copy()
+    for k in range(len(x)):
+        r = np.hypot(L[k, k], x[k])
+        c, s = r / L[k, k], x[k] / L[k, k]
+        L[k, k] = r
+        L[k + 1:, k] = (L[k + 1:, k] + s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+    return L
+
+
+class GaussianProcess:
+    """Exact GP regression kept as a Cholesky factor of the noisy Gram matrix.
+
+    Appending samples extends the factor in O(n^2) per sample instead of
+    refactoring, and predictions for a batch only need K(train, batch) and
+    the kernel diagonal of the batch, never the full K(batch, batch).
+    """
+
+    def __init__(self, kernel, noise=1e-5):
+        self.kernel = kernel
+        self.noise = noise
+        self.size = 0
+        self._X = None  # Training inputs, rows [0, size) in use
+        self._Y = None
+        self._L = None  # Lower Cholesky factor of K + noise * I, same capacity
+        self._z = None  # L^-1 Y, extended alongside L
+        self._dimensions = None
+
+    @property
+    def X_train(self):
+        return None if self._X is None else self._X[:self.size]
+
+    @property
+    def Y_train(self):
+        return None if self._Y is None else self._Y[:self.size]
+
+    @property
+    def L(self):
+        return None if self._L is None else self._L[:self.size, :self.size]
+
+    @property
+    def alpha(self):
+        # (K + noise * I)^-1 Y
+        return None if self._z is None else _solve_lower(self.L, self._z[:self.size], transpose=True)
+
+    def reset(self):
+        # Forget every sample; the kernel keeps its hyperparameters
+        self.size = 0
+        self._X = self._Y = self._L = self._z = None
+
+    def fit(self, X, Y):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        Y = np.asarray(Y, dtype=np.float64).ravel()
+        n = self.size
+        if 0 < n <= len(X) and np.array_equal(X[:n], self.X_train) and np.array_equal(Y[:n], self.Y_train):
+            # Same data with samples appended: extend the existing factor
+            self.add(X[n:], Y[n:])
+            return
+        self.refactor(X, Y)
+
+    def refactor(self, X=None, Y=None):
+        # Rebuild the factor from scratch, e.g. after the kernel changed
+        if X is None:
+            X, Y = self.X_train.copy(), self.Y_train.copy()
+        self.reset()
+        self.add(X, Y)
+
+    def log_marginal_likelihood(self, theta=None, noise=None, X=None, Y=None):
+        """Log evidence of the training data and its gradient along ``theta``.
+
+        ``theta`` defaults to the kernel's current log-hyperparameters and is
+        left set on the kernel.  With ``noise`` the gradient gains a last
+        entry for log(noise).  ``X`` and ``Y`` default to the training data.
+        """
+        if X is None:
+            X, Y = self.X_train, self.Y_train
+        if theta is not None:
+            self.kernel.theta = theta
+        fit_noise = noise is not None
+        noise = self.noise if noise is None else noise
+        K = self.kernel.gram(X)
+        L = _cholesky(K + noise * np.eye(len(X)))
+        z = _solve_lower(L, Y)
+        alpha = _solve_lower(L, z, transpose=True)
+        value = -0.5 * z @ z - np.log(np.diag(L)).sum() - 0.5 * len(X) * np.log(2 * np.pi)
+
+        # d/dt log p = 0.5 tr((alpha alpha^T - K^-1) dK/dt)
+        inner = _cholesky_inverse(L)
+        np.negative(inner, out=inner)
+        inner += np.outer(alpha, alpha)
+        gradient = 0.5 * self.kernel.theta_gradient(X, inner)
+        if fit_noise:
+            gradient = np.append(gradient, 0.5 * noise * np.trace(inner))
+        return value, gradient
+
+    def optimize_hyperparameters(self, bounds=(1e-3, 1e6), noise_bounds=None, restarts=0, rng=None,
+                                 max_samples=None):
+        """Maximize the marginal likelihood over the kernel hyperparameters.
+
+        Runs L-BFGS-B on the analytic gradient in log space from the current
+        values, from a data-scaled guess (length scales from the input
+        spread, variance from the mean squared target) and from ``restarts``
+        random points, keeping the best.  ``noise_bounds`` also fits the
+        noise level.  With ``max_samples`` only the most recent samples
+        enter the likelihood, which caps each evaluation at O(max_samples^3).
+        Refactors the GP afterwards and returns the final log likelihood.
+        """
+        from scipy.optimize import minimize
+
+        fit_noise = noise_bounds is not None
+        count = len(self.kernel.theta)
+        limits = [tuple(np.log(bounds))] * count
+        if fit_noise:
+            limits.append(tuple(np.log(noise_bounds)))
+        low, high = np.array(limits).T
+
+        X, Y = self.X_train, self.Y_train
+        if max_samples is not None:
+            X, Y = X[-max_samples:], Y[-max_samples:]
+        spread = np.maximum(X.std(axis=0), bounds[0])
+        guess = np.append(np.log(spread if self.kernel.ard else spread.mean()), np.log(max(np.mean(Y**2), bounds[0])))
+        starts = [self.kernel.theta, guess]
+        rng = np.random.default_rng(rng)
+        starts += [rng.uniform(low[:count], high[:count]) for _ in range(restarts)]
+        if fit_noise:
+            starts = [np.append(start, np.clip(np.log(self.noise), low[-1], high[-1])) for start in starts]
+
+        def negative(params):
+            noise = np.exp(params[-1]) if fit_noise else None
+            value, gradient = self.log_marginal_likelihood(params[:count], noise=noise, X=X, Y=Y)
+            return -value, -gradient
+
+        best = None
+        for start in starts:
+            start = np.clip(start, low, high)
+            try:
+                result = minimize(negative, start, jac=True, method="L-BFGS-B", bounds=limits)
+            except np.linalg.LinAlgError:
+                continue
+            if best is None or result.fun < best.fun:
+                best = result
+        if best is None:
+            raise np.linalg.LinAlgError("No start gave a positive definite kernel matrix")
+        self.kernel.theta = best.x[:count]
+        if fit_noise:
+            self.noise = float(np.exp(best.x[-1]))
+        self.refactor()
+        return -float(best.fun)
+
+    def reserve(self, capacity):
+        # Grow the buffers geometrically so appends stay amortized O(n^2)
+        if self._X is not None and capacity <= len(self._X):
+            return
+        capacity = max(capacity, 2 * (0 if self._X is None else len(self._X)), 16)
+        X = np.empty((capacity, self._dimensions))
+        Y = np.empty(capacity)
+        L = np.zeros((capacity, capacity))
+        z = np.empty(capacity)
+        n = self.size
+        if n:
+            X[:n], Y[:n], L[:n, :n], z[:n] = self.X_train, self.Y_train, self.L, self._z[:n]
+        self._X, self._Y, self._L, self._z = X, Y, L, z
+
+    def add(self, X, Y):
+        """Append samples, extending the Cholesky factor block-wise."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        Y = np.asarray(Y, dtype=np.float64).ravel()
+        if len(X) == 0:
+            return
+        self._dimensions = X.shape[1]
+        n, m = self.size, len(X)
+        self.reserve(n + m)
+
+        # [[L, 0], [B^T, C]] with L B = K(old, new) and C C^T = K(new, new) + noise - B^T B
+        schur = self.kernel(X, X) + self.noise * np.eye(m)
+        rhs = Y.copy()
+        if n:
+            B = _solve_lower(self.L, self.kernel(self.X_train, X))
+            schur -= B.T @ B
+            rhs -= B.T @ self._z[:n]
+            self._L[n:n + m, :n] = B.T
+        C = _cholesky(schur)
+        self._L[n:n + m, n:n + m] = C
+        self._z[n:n + m] = _solve_lower(C, rhs)
+        self._X[n:n + m] = X
+        self._Y[n:n + m] = Y
+        self.size = n + m
+
+    def predict(self, X):
+        """Posterior mean and variance (the covariance diagonal) at each row of X."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        variance = self.kernel.diag(X) + 1e-8
+        if self.size == 0:
+            return np.zeros(len(X)), variance
+        # With v = L^-1 K_s the mean is v^T L^-1 Y and the variance k(x, x) - |v|^2
+        v = _solve_lower(self.L, self.kernel(self.X_train, X))
+        mu = v.T @ self._z[:self.size]
+        variance -= np.einsum("ij,ij->j", v, v)
+        return mu, np.maximum(variance, 0)
+
+
+class RBFKernel:
+    """Squared-exponential kernel ``variance * exp(-|x - x'|^2 / (2 l^2))``.
+
+    ``length_scale`` is a scalar or one value per input dimension (ARD).
+    The scaled inputs and squared norms of the last two first-argument sets
+    are cached and extended when a set only gains rows, so a GP's growing
+    training set is not rescaled for every prediction; ``gram`` caches
+    K(X, X) until the inputs or hyperparameters change.
+    """
+
+    def __init__(self, length_scale=1.0, variance=1.0):
+        self._cache = []  # Up to two (X, X / l, |X / l|^2) entries, most recent first
+        self._gram = None
+        self.length_scale = length_scale
+        self.variance = variance
+
+    @property
+    def length_scale(self):
+        return self._length_scale
+
+    @length_scale.setter
+    def length_scale(self, value):
+        self._length_scale = np.asarray(value, dtype=np.float64)
+        self._cache = []
+        self._gram = None
+
+    @property
+    def ard(self):
+        # One length scale per dimension, even when there is a single dimension
+        return self._length_scale.ndim > 0
+
+    @property
+    def variance(self):
+        return self._variance
+
+    @variance.setter
+    def variance(self, value):
+        self._variance = float(value)
+        self._gram = None
+
+    @property
+    def theta(self):
+        # Log-hyperparameters: the length scale(s), then the variance
+        return np.log(np.append(self.length_scale.ravel(), self.variance))
+
+    @theta.setter
+    def theta(self, value):
+        value = np.exp(np.asarray(value, dtype=np.float64))
+        self.length_scale = value[:-1] if self.ard else value[0]
+        self.variance = value[-1]
+
+    def _scale(self, X):
+        scaled = X / self.length_scale
+        return scaled, np.einsum("ij,ij->i", scaled, scaled)
+
+    def _cached_scale(self, X):
+        for entry in self._cache:
+            cached, scaled, norms = entry
+            n = len(cached)
+            if n <= len(X) and cached.shape[1:] == X.shape[1:] and np.array_equal(X[:n], cached):
+                if n < len(X):
+                    extra, extra_norms = self._scale(X[n:])
+                    entry = (X.copy(), np.vstack([scaled, extra]), np.append(norms, extra_norms))
+                break
+        else:
+            entry = (X.copy(), *self._scale(X))
+        self._cache = [entry] + [other for other in self._cache if other is not entry][:1]
+        return entry[1], entry[2]
+
+    def __call__(self, X1, X2):
+        S1, N1 = self._cached_scale(np.asarray(X1, dtype=np.float64))
+        S2, N2 = self._scale(np.asarray(X2, dtype=np.float64))
+        sqdist = np.maximum(N1[:, None] + N2 - 2 * S1 @ S2.T, 0)
+        return self.variance * np.exp(-0.5 * sqdist)
+
+    def diag(self, X):
+        return np.full(len(X), self.variance)
+
+    def gram(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self._gram is None or not np.array_equal(self._gram[0], X):
+            self._gram = (X.copy(), self(X, X))
+        return self._gram[1]
+
+    def theta_gradient(self, X, weights):
+        """sum_ij weights_ij dK(X, X)_ij / dtheta, one entry per hyperparameter.
+
+        d/d log l_d of K_ij is K_ij (x_id - x_jd)^2 / l_d^2, so with W the
+        weights times K each length-scale entry expands into row sums of W
+        and one quadratic form s_d^T W s_d; no (n, n, len(theta)) tensor of
+        derivatives is formed.  d/d log variance of K_ij is K_ij itself.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        W = weights * self.gram(X)
+        scaled = X / self.length_scale
+        sums = W.sum(axis=1) + W.sum(axis=0)
+        per_dimension = np.einsum("id,i->d", scaled**2, sums) - 2 * np.einsum("id,id->d", scaled, W @ scaled)
+        if not self.ard:
+            per_dimension = per_dimension.sum(keepdims=True)
+        return np.append(per_dimension, W.sum())
+
+
+class SlidingWindowGP(GaussianProcess):
+    """Exact GP on only the most recent ``window`` samples.
+
+    Dropping the oldest sample is a rank-one update of the trailing block
+    of the factor, so every add stays O(window^2) however long the run.
+    """
+
+    def __init__(self, kernel, noise=1e-5, window=500):
+        super().__init__(kernel, noise=noise)
+        self.window = window
+
+    def add(self, X, Y):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        Y = np.asarray(Y, dtype=np.float64).ravel()
+        # Samples that would be dropped straight away are never factored
+        super().add(X[-self.window:], Y[-self.window:])
+        while self.size > self.window:
+            self.drop_oldest()
+
+    def drop_oldest(self):
+        # K[1:, 1:] = L[1:, 1:] L[1:, 1:]^T + l l^T with l = L[1:, 0]
+        n = self.size - 1
+        L = _cholesky_update(self.L[1:, 1:].copy(), self.L[1:, 0])
+        self._L[:n, :n] = L
+        self._L[n, :] = 0
+        self._L[:, n] = 0
+        self._X[:n] = self._X[1:n + 1]
+        self._Y[:n] = self._Y[1:n + 1]
+        self._z[:n] = _solve_lower(L, self._Y[:n])
+        self.size = n
+
+
+class SparseGP:
+    """Inducing-point GP with a fixed budget, FITC or subset of regressors.
+
+    Samples are folded into m x m sufficient statistics over the ``m``
+    inducing points, so adding one costs O(m^2) and memory does not grow
+    with the number of samples.  "SoR" treats every sample as noise-only
+    beyond its projection on the inducing points; "FITC" also keeps the
+    per-sample residual variance k(x, x) - q(x, x).
+    """
+
+    def __init__(self, kernel, inducing_points, noise=1e-5, method="FITC"):
+        if method not in ("FITC", "SoR"):
+            raise ValueError(f"Unknown sparse GP method: {method!r}")
+        self.kernel = kernel
+        self.noise = noise
+        self.method = method
+        self.Z = np.atleast_2d(np.asarray(inducing_points, dtype=np.float64))
+        self.K_mm = self.kernel(self.Z, self.Z) + 1e-8 * np.eye(len(self.Z))
+        self.L_mm = _cholesky(self.K_mm)
+        self.reset()
+
+    @property
+    def size(self):
+        # Width of every kernel block this model evaluates
+        return len(self.Z)
+
+    def reset(self):
+        self.count = 0
+        self.A = self.K_mm.copy()  # K_mm + K_mn Lambda^-1 K_nm
+        self.b = np.zeros(len(self.Z))  # K_mn Lambda^-1 Y
+        self._L_A = None
+        self._u = None
+
+    def fit(self, X, Y):
+        self.reset()
+        self.add(X, Y)
+
+    def add(self, X, Y):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        Y = np.asarray(Y, dtype=np.float64).ravel()
+        K_mn = self.kernel(self.Z, X)
+        precision = np.full(len(X), 1 / self.noise)
+        if self.method == "FITC":
+            v = _solve_lower(self.L_mm, K_mn)
+            precision = 1 / (self.kernel.diag(X) - np.einsum("ij,ij->j", v, v) + self.noise)
+        weighted = K_mn * precision
+        self.A += weighted @ K_mn.T
+        self.b += weighted @ Y
+        self.count += len(X)
+        self._L_A = None
+
+    def predict(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if self._L_A is None:
+            self._L_A = _cholesky(self.A)
+            self._u = _solve_lower(self._L_A, self.b)
+        K_ms = self.kernel(self.Z, X)
+        c = _solve_lower(self._L_A, K_ms)
+        mu = c.T @ self._u
+        variance = np.einsum("ij,ij->j", c, c) + 1e-8
+        if self.method == "FITC":
+            v = _solve_lower(self.L_mm, K_ms)
+            variance += self.kernel.diag(X) - np.einsum("ij,ij->j", v, v)
+        return mu, np.maximum(variance, 0)
+
+
+def approximation_error(model, X, Y, X_holdout):
+    """Fit ``model`` and an exact GP on (X, Y) and compare them on X_holdout.
+
+    Returns the RMS and worst absolute differences of the posterior mean
+    and the RMS difference of the posterior standard deviation.
+    """
+    model.fit(X, Y)
+    exact = GaussianProcess(model.kernel, noise=model.noise)
+    exact.fit(X, Y)
+    mu, variance = model.predict(X_holdout)
+    exact_mu, exact_variance = exact.predict(X_holdout)
+    return {
+        "mean_rmse": float(np.sqrt(np.mean((mu - exact_mu) ** 2))),
+        "mean_max_error": float(np.max(np.abs(mu - exact_mu))),
+        "std_rmse": float(np.sqrt(np.mean((np.sqrt(variance) - np.sqrt(exact_variance)) ** 2))),
+    }
+
+
+def _normal_cdf_pdf(z):
+    from scipy.special import ndtr
+
+    return ndtr(z), np.exp(-0.5 * z**2) / np.sqrt(2 * np.pi)
+
+
+# Acquisition functions for minimization: (mu, sigma, best value) -> (N,)
+# scores where higher means more worth sampling.
+def upper_confidence_bound(mu, sigma, best, kappa=2.0):
+    # Confidence bound on -f, i.e. the negated lower confidence bound of f
+    return -(mu - kappa * sigma)
+
+
+def expected_improvement(mu, sigma, best, xi=0.01):
+    improvement = best - mu - xi
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(sigma > 0, improvement / sigma, 0.0)
+    cdf, pdf = _normal_cdf_pdf(z)
+    return np.where(sigma > 0, improvement * cdf + sigma * pdf, np.maximum(improvement, 0))
+
+
+def probability_of_improvement(mu, sigma, best, xi=0.01):
+    improvement = best - mu - xi
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(sigma > 0, improvement / sigma, np.where(improvement > 0, np.inf, -np.inf))
+    return _normal_cdf_pdf(z)[0]
+
+
+ACQUISITION_FUNCTIONS = {
+    "UCB": upper_confidence_bound,
+    "EI": expected_improvement,
+    "PI": probability_of_improvement,
+}
+
+
+class DragonflyOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, kernel=None, acquisition_function="UCB", noise=1e-5,
+                 random_initial_points=5, step_size=0.1, grid_spacing=None, block_elements=1 << 20,
+                 gp_mode="exact", window=500, inducing_count=200, sparse_method="FITC", fit_every=None,
+                 fit_samples=500, seed=None):
+        # acquisition_function is "UCB", "EI" or "PI".  With grid_spacing the
+        # acquisition is also scored on a dense grid of that spacing and the
+        # best grid point competes with the swarm.  block_elements bounds the
+        # size of the train x query kernel block evaluated at once.
+        # gp_mode "window" keeps only the last ``window`` samples; "sparse"
+        # uses ``inducing_count`` uniformly placed inducing points.  With
+        # fit_every the kernel hyperparameters are refit by marginal
+        # likelihood on the initial samples and then every fit_every steps,
+        # each time on at most the fit_samples most recent samples.
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        if acquisition_function not in ACQUISITION_FUNCTIONS:
+            raise ValueError(f"Unknown acquisition function: {acquisition_function!r}")
+        self.kernel = kernel if kernel is not None else RBFKernel()
+        self.acquisition_function = acquisition_function
+        if gp_mode == "exact":
+            self.gp = GaussianProcess(self.kernel, noise=noise)
+        elif gp_mode == "window":
+            self.gp = SlidingWindowGP(self.kernel, noise=noise, window=window)
+        elif gp_mode == "sparse":
+            self.gp = SparseGP(self.kernel, self.uniform_positions(inducing_count), noise=noise, method=sparse_method)
+        else:
+            raise ValueError(f"Unknown GP mode: {gp_mode!r}")
+        if fit_every is not None and gp_mode == "sparse":
+            raise ValueError("Hyperparameter fitting needs the samples, which the sparse GP does not keep")
+        self.fit_every = fit_every
+        self.fit_samples = fit_samples
+        self.random_initial_points = random_initial_points
+        self.step_size = step_size
+        self.grid_spacing = grid_spacing
+        self.block_elements = block_elements
+        self.grid = None
+        self.last_position = None
+        self.last_value = None
+
+    @property
+    def X_sample(self):
+        # Samples the GP still holds; the sparse mode keeps none
+        return getattr(self.gp, "X_train", None)
+
+    @property
+    def Y_sample(self):
+        return getattr(self.gp, "Y_train", None)
+
+    def uniform_positions(self, count):
+        return self.rng.uniform(self.bounds[:, 0], self.bounds[:, 1], size=(count, self.dimensions))
+
+    def initialize(self):
+        self.state = SwarmState(self.swarm_size, self.dimensions)
+        self.state.positions[...] = self.uniform_positions(self.swarm_size)
+        self.gp.reset()
+        self.last_position = None
+        self.last_value = None
+        # Seed the GP so the first acquisition step has data to predict from
+        initial = self.uniform_positions(max(1, self.random_initial_points))
+        self.add_samples(initial, self.evaluate(initial))
+        if self.fit_every is not None:
+            self.gp.optimize_hyperparameters(max_samples=self.fit_samples)
+
+    def approximation_error(self, count=500, holdout_count=500, rng=None):
+        """How far this optimizer's GP mode is from an exact GP on the objective.
+
+        A copy of the GP is fitted to ``count`` uniform samples of the
+        objective and compared with an exact GP on ``holdout_count`` other
+        uniform points; the optimizer's own GP is left untouched.
+        """
+        rng = np.random.default_rng(rng)
+        low, high = self.bounds[:, 0], self.bounds[:, 1]
+        X = rng.uniform(low, high, size=(count, self.dimensions))
+        X_holdout = rng.uniform(low, high, size=(holdout_count, self.dimensions))
+        return approximation_error(copy.deepcopy(self.gp), X, self.evaluate(X), X_holdout)
+
+    def add_samples(self, X, Y):
+        self.gp.add(X, Y)
+        best = int(np.argmin(Y))
+        self.record_best(X[best], Y[best])
+
+    def candidate_grid(self, spacing):
+        axes = [np.append(np.arange(low, high, spacing), high) for low, high in self.bounds]
+        return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, self.dimensions)
+
+    def acquisition(self, X):
+        """Acquisition score for every row of X, one GP prediction per block."""
+        X = np.atleast_2d(X)
+        function = ACQUISITION_FUNCTIONS[self.acquisition_function]
+        scores = np.empty(len(X))
+        block = max(1, self.block_elements // max(1, self.gp.size))
+        for start in range(0, len(X), block):
+            mu, variance = self.gp.predict(X[start:start + block])
+            scores[start:start + block] = function(mu, np.sqrt(variance), self.best_value)
+        return scores
+
+    def step(self):
+        # Acquisition step: sample the objective where the acquisition peaks
+        candidates = self.positions
+        if self.grid_spacing is not None:
+            if self.grid is None:
+                self.grid = self.candidate_grid(self.grid_spacing)
+            candidates = np.vstack([candidates, self.grid])
+        best_index = np.argmax(self.acquisition(candidates))
+        self.last_position = candidates[best_index].copy()
+        self.last_value = self.evaluate(self.last_position)[0]
+
+        # Random movement of the swarm
+        positions = self.state.positions
+        positions += self.rng.standard_normal(positions.shape) * self.step_size
+        self.clip(positions, out=positions)
+
+        self.add_samples(self.last_position.reshape(1, -1), [self.last_value])
+        if self.fit_every is not None and (self.iteration + 1) % self.fit_every == 0:
+            self.gp.optimize_hyperparameters(max_samples=self.fit_samples)
+
+    def approximation_error(self, count=500, holdout_count=500, rng=None):
+        """How far this optimizer's GP mode is from an exact GP on the objective.
+
+        A copy of the GP is fitted to ``count`` uniform samples of the
+        objective and compared with an exact GP on ``holdout_count`` other
+        uniform points; the optimizer's own GP is left untouched.
+        """
+        rng = np.random.default_rng(rng)
+        low, high = self.bounds[:, 0], self.bounds[:, 1]
+        X = rng.uniform(low, high, size=(count, self.dimensions))
+        X_holdout = rng.uniform(low, high, size=(holdout_count, self.dimensions))
+        return approximation_error(copy.deepcopy(self.gp), X, self.evaluate(X), X_holdout)
@@ -0,0 +1,95 @@
+"""Firefly Algorithm."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+class FireflyOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, gamma=1.0, alpha=20.0, neighbor_limited=False,
+                 attraction_threshold=1e-6, block_elements=1 << 20, seed=None):
+        # Dense mode evaluates all pairs a block of rows at a time so memory
+        # stays near block_elements floats.  neighbor_limited only looks at
+        # pairs closer than the distance where exp(-gamma * d^2) drops below
+        # attraction_threshold, found with a k-d tree.
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.gamma = gamma  # Light absorption coefficient
+        self.alpha = alpha  # Randomness coefficient
+        self.neighbor_limited = neighbor_limited
+        self.attraction_threshold = attraction_threshold
+        self.block_elements = block_elements
+        self.brightness = None
+
+    @property
+    def cutoff(self):
+        return np.sqrt(-np.log(self.attraction_threshold) / self.gamma)
+
+    def initialize(self):
+        super().initialize()
+        self.brightness = np.full(self.swarm_size, np.inf)
+
+    def step(self):
+        state = self.state
+        positions = state.positions
+        state.fitness[...] = self.evaluate(positions)
+        best = state.best_index()
+        self.record_best(positions[best], state.fitness[best])
+        self.brightness[...] = 1.0 / (1.0 + state.fitness)
+
+        if self.neighbor_limited:
+            moves, attracted = self.neighbor_attraction()
+        else:
+            moves, attracted = self.dense_attraction()
+
+        # Fireflies with a brighter partner move and take one random step
+        moves[attracted] += self.alpha * self.rng.uniform(-1, 1, (np.count_nonzero(attracted), self.dimensions))
+        positions += moves
+        self.clip(positions, out=positions)
+
+    def dense_attraction(self):
+        positions = self.state.positions
+        brightness = self.brightness
+        moves = np.zeros_like(positions)
+        attracted = np.zeros(self.swarm_size, dtype=bool)
+
+        rows = max(1, self.block_elements // max(1, self.swarm_size))
+        for lo in range(0, self.swarm_size, rows):
+            block = positions[lo:lo + rows]
+            sqdist = np.zeros((len(block), self.swarm_size))
+            for d in range(self.dimensions):
+                sqdist += (positions[:, d] - block[:, d:d + 1]) ** 2
+
+            # beta[i, j] pulls firefly i towards every brighter firefly j
+            beta = np.exp(-self.gamma * sqdist)
+            brighter = brightness > brightness[lo:lo + rows, None]
+            beta *= brighter
+            moves[lo:lo + rows] = beta @ positions - beta.sum(axis=1, keepdims=True) * block
+            attracted[lo:lo + rows] = brighter.any(axis=1)
+        return moves, attracted
+
+    def neighbor_attraction(self):
+        from scipy.spatial import cKDTree
+
+        positions = self.state.positions
+        brightness = self.brightness
+        moves = np.zeros_like(positions)
+        # Every firefly with a brighter partner anywhere moves, as in dense
+        # mode; the cutoff only limits which pairs add to the attraction
+        attracted = brightness < brightness.max()
+
+        pairs = cKDTree(positions).query_pairs(self.cutoff, output_type="ndarray")
+        if len(pairs) == 0:
+            return moves, attracted
+
+        # Orient each pair so the dimmer firefly moves towards the brighter one
+        i, j = pairs[:, 0], pairs[:, 1]
+        swap = brightness[i] > brightness[j]
+        i, j = np.where(swap, j, i), np.where(swap, i, j)
+        keep = brightness[j] > brightness[i]
+        i, j = i[keep], j[keep]
+
+        delta = positions[j] - positions[i]
+        beta = np.exp(-self.gamma * np.einsum("ij,ij->i", delta, delta))
+        for d in range(self.dimensions):
+            moves[:, d] = np.bincount(i, weights=beta * delta[:, d], minlength=self.swarm_size)
+        return moves, attracted
@@ -0,0 +1,36 @@
+"""Grey Wolf Optimizer."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+class GreyWolfOptimizer(SwarmOptimizer):
+    def leaders(self):
+        # Indices of the alpha, beta and delta wolves without sorting the pack;
+        # packs smaller than three reuse the alpha for the missing leaders.
+        fitness = self.state.fitness
+        count = min(3, len(fitness))
+        best = np.argpartition(fitness, count - 1)[:count]
+        best = best[np.argsort(fitness[best], kind="stable")]
+        return np.concatenate([best, np.repeat(best[:1], 3 - count)])
+
+    def step(self):
+        state = self.state
+        positions = state.positions
+        state.fitness[...] = self.evaluate(positions)
+        leaders = self.leaders()
+        self.record_best(positions[leaders[0]], state.fitness[leaders[0]])
+
+        # (D, 3) copy of the leader positions, broadcast against every wolf
+        leader_positions = positions[leaders].T
+        a = 2 - 2 * self.progress  # Linearly decreasing parameter
+
+        shape = (self.swarm_size, self.dimensions, 3)
+        A = 2 * a * self.rng.random(shape) - a
+        C = 2 * self.rng.random(shape)
+        distance = np.abs(C * leader_positions - positions[:, :, None])
+
+        # Average the pulls towards alpha, beta and delta
+        positions[...] = (leader_positions - A * distance).mean(axis=2)
+        self.clip(positions, out=positions)
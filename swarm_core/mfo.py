@@ -0,0 +1,67 @@
+"""Moth-Flame Optimization."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+def merge_sorted(values_a, values_b, keep):
+    # Indices into concat(values_a, values_b) of the ``keep`` smallest values,
+    # merging the two already sorted arrays; ties keep values_a first.
+    rank_a = np.arange(len(values_a)) + np.searchsorted(values_b, values_a, side="left")
+    rank_b = np.arange(len(values_b)) + np.searchsorted(values_a, values_b, side="right")
+    order = np.empty(len(values_a) + len(values_b), dtype=np.intp)
+    order[rank_a] = np.arange(len(values_a))
+    order[rank_b] = len(values_a) + np.arange(len(values_b))
+    return order[:keep]
+
+
+class MothFlameOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, spiral_shape=1.0, seed=None):
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.spiral_shape = spiral_shape
+        self.flame_positions = None
+        self.flame_values = None
+
+    def initialize(self):
+        super().initialize()
+        self.flame_positions = np.zeros((self.swarm_size, self.dimensions))
+        self.flame_values = np.full(self.swarm_size, np.inf)
+
+    @property
+    def flame_count(self):
+        # Shrinks from N flames to one over the run
+        n = self.swarm_size
+        return max(1, int(round(n - self.progress * (n - 1))))
+
+    def update_flames(self):
+        # Only moths that beat the worst flame can enter the archive, so just
+        # those are sorted and merged into it.
+        fitness = self.state.fitness
+        entering = np.flatnonzero(fitness < self.flame_values[-1])
+        if len(entering) == 0:
+            return
+        entering = entering[np.argsort(fitness[entering], kind="stable")]
+        keep = merge_sorted(self.flame_values, fitness[entering], self.swarm_size)
+
+        merged_values = np.concatenate([self.flame_values, fitness[entering]])
+        merged_positions = np.concatenate([self.flame_positions, self.state.positions[entering]])
+        self.flame_values[...] = merged_values[keep]
+        self.flame_positions[...] = merged_positions[keep]
+
+    def step(self):
+        state = self.state
+        positions = state.positions
+        state.fitness[...] = self.evaluate(positions)
+        self.update_flames()
+        self.record_best(self.flame_positions[0], self.flame_values[0])
+
+        # Moth i circles flame i; the surplus moths share the last flame
+        flames = self.flame_positions[np.minimum(np.arange(self.swarm_size), self.flame_count - 1)]
+
+        # Spiral parameter t in [r, 1] with r falling from -1 to -2
+        r = -1 - self.progress
+        t = (r - 1) * self.rng.random((self.swarm_size, 1)) + 1
+        distance = np.abs(flames - positions)
+        spiral = distance * np.exp(self.spiral_shape * t) * np.cos(2 * np.pi * t) + flames
+        self.clip(spiral, out=positions)
@@ -0,0 +1,63 @@
+"""Particle Swarm Optimization."""
+
+from .base import SwarmOptimizer
+
+
+class ParticleSwarmOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, inertia=0.5, cognitive=2.0, social=2.0,
+                 synchronous=True, seed=None):
+        # synchronous=True scores the whole swarm, then moves it in one batch.
+        # synchronous=False keeps the per-particle loop where each particle
+        # sees the global best found by the particles before it.
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.inertia = inertia
+        self.cognitive = cognitive
+        self.social = social
+        self.synchronous = synchronous
+
+    def initialize(self):
+        super().initialize()
+        state = self.state
+        state.velocities[...] = self.rng.uniform(-1, 1, state.velocities.shape)
+        state.best_positions[...] = state.positions
+
+    def step(self):
+        if self.synchronous:
+            self.step_synchronous()
+        else:
+            self.step_asynchronous()
+
+    def step_synchronous(self):
+        state = self.state
+        positions, velocities = state.positions, state.velocities
+
+        state.fitness[...] = self.evaluate(positions)
+        state.update_personal_best()
+        best = state.best_index()
+        self.record_best(positions[best], state.fitness[best])
+
+        # One random coefficient per particle and term, as in the per-particle loop
+        r_cognitive = self.rng.random((self.swarm_size, 1))
+        r_social = self.rng.random((self.swarm_size, 1))
+        velocities *= self.inertia
+        velocities += self.cognitive * r_cognitive * (state.best_positions - positions)
+        velocities += self.social * r_social * (self.best_position - positions)
+        positions += velocities
+        self.clip(positions, out=positions)
+
+    def step_asynchronous(self):
+        state = self.state
+        for i in range(self.swarm_size):
+            position = state.positions[i]
+            velocity = state.velocities[i]
+            fitness = state.fitness[i] = self.evaluate(position)[0]
+            if fitness < state.best_values[i]:
+                state.best_values[i] = fitness
+                state.best_positions[i] = position
+            self.record_best(position, fitness)
+
+            velocity *= self.inertia
+            velocity += self.cognitive * self.rng.random() * (state.best_positions[i] - position)
+            velocity += self.social * self.rng.random() * (self.best_position - position)
+            position += velocity
+            self.clip(position, out=position)
@@ -0,0 +1,112 @@
+"""Memory-mapped access to height-map rasters larger than RAM."""
+
+import math
+
+import numpy as np
+
+RASTER_SUFFIXES = (".npy", ".tif", ".tiff")
+
+
+def open_raster(path):
+    """Open a ``.npy`` or TIFF raster without reading it into memory.
+
+    ``.npy`` files and uncompressed TIFFs are memory-mapped; tiled or
+    compressed TIFFs are opened through ``tifffile``'s zarr store, which
+    decodes only the tiles a slice touches.
+    """
+    lower = str(path).lower()
+    if lower.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if lower.endswith((".tif", ".tiff")):
+        import tifffile
+
+        try:
+            return tifffile.memmap(path, mode="r")
+        except ValueError:
+            import zarr
+
+            return zarr.open(tifffile.imread(path, aszarr=True), mode="r")
+    raise ValueError(f"Not a memory-mappable raster: {path}")
+
+
+def rgb_to_gray(block):
+    # Same weights and rounding as cv2.cvtColor(..., cv2.COLOR_RGB2GRAY)
+    if block.dtype == np.uint8:
+        r, g, b = (block[..., i].astype(np.int32) for i in range(3))
+        return ((r * 4899 + g * 9617 + b * 1868 + 8192) >> 14).astype(np.uint8)
+    return block[..., 0] * 0.299 + block[..., 1] * 0.587 + block[..., 2] * 0.114
+
+
+class RasterView:
+    """Two-dimensional height view of a (possibly memory-mapped) raster.
+
+    Indexing reads only the requested pixels and reduces them to a single
+    band: ``channel`` selects one band of a multi-band raster and "gray"
+    converts RGB bands to luminance.  Basic slices and integer index
+    arrays are both supported, so tiles and particle lookups alike never
+    load the whole raster.
+    """
+
+    def __init__(self, raster, channel=None):
+        if len(raster.shape) == 3 and channel is None:
+            raise ValueError("A multi-band raster needs a channel or 'gray'")
+        self.raster = raster
+        self.channel = channel
+
+    @property
+    def shape(self):
+        return tuple(self.raster.shape[:2])
+
+    @property
+    def dtype(self):
+        if self.channel == "gray" and self.raster.dtype != np.uint8:
+            return np.dtype(np.float64)
+        return self.raster.dtype
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        fancy = any(isinstance(k, np.ndarray) for k in key)
+        if fancy and not isinstance(self.raster, np.ndarray):
+            block = self._points(*key)
+        else:
+            block = np.asarray(self.raster[key])
+        if len(self.raster.shape) == 2:
+            return block
+        if self.channel == "gray":
+            return rgb_to_gray(block)
+        return block[..., self.channel]
+
+    def _points(self, rows, cols):
+        # Point reads from chunked stores (zarr) go through vectorized indexing
+        if len(self.raster.shape) == 2:
+            return np.asarray(self.raster.vindex[rows, cols])
+        bands = [self.channel] if isinstance(self.channel, int) else range(self.raster.shape[2])
+        values = [np.asarray(self.raster.vindex[rows, cols, np.full_like(rows, band)]) for band in bands]
+        if isinstance(self.channel, int):
+            # Put the single band back where block[..., channel] expects it
+            stacked = np.zeros(values[0].shape + (self.raster.shape[2],), dtype=values[0].dtype)
+            stacked[..., self.channel] = values[0]
+            return stacked
+        return np.stack(values, axis=-1)
+
+    def __array__(self, dtype=None, copy=None):
+        # Explicit full read, e.g. for a pyramid level that is the raster itself
+        block = self[:, :]
+        return block if dtype is None else block.astype(dtype)
+
+
+def tiles(shape, tile):
+    # (rows, cols) slices covering a (height, width) raster in tile x tile blocks
+    height, width = shape[:2]
+    for r0 in range(0, height, tile):
+        for c0 in range(0, width, tile):
+            yield slice(r0, min(height, r0 + tile)), slice(c0, min(width, c0 + tile))
+
+
+def preview(raster, max_side=2048):
+    """Strided downsample of a raster for display, and the stride used."""
+    stride = max(1, math.ceil(max(raster.shape[:2]) / max_side))
+    image = np.asarray(raster[::stride, ::stride])
+    if image.ndim == 2 and image.dtype == np.uint8:
+        image = np.repeat(image[..., None], 3, axis=2)
+    return image, stride
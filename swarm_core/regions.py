@@ -0,0 +1,485 @@
+"""Local-maximum region detection on convolved height maps.
+
+This is the pipeline of the convolution analyzer: an edge-response
+convolution, a maximum filter that marks local maxima, and DBSCAN grouping
+nearby maxima into bounding boxes (or :func:`mask_regions`, which finds the
+same boxes by labelling the maxima mask).  SciPy and scikit-learn are
+imported where they are used.
+
+The tiled functions take ``workers`` to spread tiles over a process pool
+(``pool="process"``) or a thread pool (``pool="thread"``).  Results come
+back in tile order, so they do not depend on the number of workers.
+"""
+
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from .raster import tiles
+
+EDGE_KERNEL = np.array([[1, 1, 1], [1, -7, 1], [1, 1, 1]])  # Simple edge detection filter
+
+
+def edge_response(height_map):
+    from scipy.ndimage import convolve
+
+    return convolve(height_map, EDGE_KERNEL)
+
+
+def maxima_mask(image, size=20):
+    from scipy.ndimage import maximum_filter
+
+    return maximum_filter(image, size=size) == image
+
+
+def edge_maxima(height_map, size=20, min_response=None):
+    # Mask of every pixel whose edge response is the maximum of its
+    # size x size neighbourhood (and at least min_response, if given)
+    response = edge_response(height_map)
+    mask = maxima_mask(response, size)
+    if min_response is not None:
+        mask &= response >= min_response
+    return mask
+
+
+def local_maxima(height_map, size=20, min_response=None):
+    # (row, col) of every pixel marked by edge_maxima
+    return np.argwhere(edge_maxima(height_map, size, min_response))
+
+
+def halo(size):
+    # Pixels beyond a block that the convolution and maximum filter read
+    return size // 2 + 2
+
+
+def read_block(height_map, rows, cols, size=20):
+    # The block height_map[rows, cols] with its halo, and the block's
+    # (row, col) offsets inside what was read
+    height, width = height_map.shape
+    h = halo(size)
+    r0, r1 = max(0, rows.start - h), min(height, rows.stop + h)
+    c0, c1 = max(0, cols.start - h), min(width, cols.stop + h)
+    core = (slice(rows.start - r0, rows.stop - r0), slice(cols.start - c0, cols.stop - c0))
+    return np.asarray(height_map[r0:r1, c0:c1]), core
+
+
+def core_mask(values, core, size=20, min_response=None):
+    # edge_maxima of a block read with its halo, cut down to the block; the
+    # picklable unit of work handed to pool workers
+    return edge_maxima(values, size, min_response)[core]
+
+
+def executor(workers, pool="process"):
+    """A pool of ``workers``, or None to work serially in the caller."""
+    if pool not in ("process", "thread"):
+        raise ValueError(f"Unknown pool: {pool}")
+    if workers is None or workers <= 1:
+        return None
+    return (ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor)(max_workers=workers)
+
+
+def ordered_map(pool, function, tasks, window):
+    # Like pool.map, but with at most ``window`` tasks submitted at a time,
+    # so blocks are read just ahead of the workers rather than all at once
+    if pool is None:
+        yield from (function(*task) for task in tasks)
+        return
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(function, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def map_blocks(height_map, function, tile=1024, size=20, min_response=None, workers=None, pool="process"):
+    # (rows, cols, function(values, core, size, min_response)) for every
+    # tile, read here with its halo and handed to the workers, in tile order
+    blocks = list(tiles(height_map.shape, tile))
+    tasks = ((*read_block(height_map, rows, cols, size), size, min_response) for rows, cols in blocks)
+    workers_pool = executor(workers, pool)
+    try:
+        results = list(ordered_map(workers_pool, function, tasks, 2 * (workers or 1)))
+    finally:
+        if workers_pool is not None:
+            workers_pool.shutdown()
+    return [(rows, cols, result) for (rows, cols), result in zip(blocks, results)]
+
+
+def tiled_maxima(height_map, tile=1024, size=20, min_response=None, workers=None, pool="process"):
+    """:func:`local_maxima` computed one ``tile`` x ``tile`` block at a time.
+
+    Each block is filtered together with its :func:`halo`, so the stitched
+    result is exactly the whole-map result with no seams, while only the
+    blocks being worked on are in memory; ``height_map`` may be a
+    memory-mapped array or a :class:`~swarm_core.raster.RasterView`.
+    Blocks are read here and filtered by ``workers``, if given.
+    """
+    blocks = map_blocks(height_map, core_mask, tile, size, min_response, workers, pool)
+    found = [np.argwhere(mask) + (rows.start, cols.start) for rows, cols, mask in blocks]
+    return np.concatenate(found) if found else np.empty((0, 2), dtype=np.intp)
+
+
+def cluster_labels(points, eps=20):
+    # DBSCAN with min_samples=1: every point is a core point, so clusters
+    # are the groups of points chained together by gaps of at most eps
+    from sklearn.cluster import DBSCAN
+
+    if len(points) == 0:
+        return np.empty(0, dtype=np.intp)
+    return DBSCAN(eps=eps, min_samples=1).fit(points).labels_
+
+
+def tiled_cluster_labels(maxima, eps=20, tile=1024, workers=None, pool="process"):
+    """:func:`cluster_labels` of ``maxima`` clustered one tile at a time.
+
+    Each tile's maxima are clustered on their own (by ``workers``, if
+    given), then clusters are merged wherever two maxima in different tiles
+    lie within ``eps`` of each other; only maxima within ``eps`` of a tile
+    edge can, so only those are compared.  The clusters are the same as
+    clustering all maxima at once, though numbered differently.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    maxima = np.asarray(maxima).reshape(-1, 2)
+    if len(maxima) == 0:
+        return np.empty(0, dtype=np.intp)
+    cells = maxima // tile
+    _, tile_ids, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    tile_ids = tile_ids.ravel()
+    order = np.argsort(tile_ids, kind="stable")
+    groups = np.split(order, np.cumsum(counts)[:-1])
+
+    workers_pool = executor(workers, pool)
+    try:
+        local = list(ordered_map(workers_pool, cluster_labels, ((maxima[group], eps) for group in groups),
+                                 2 * (workers or 1)))
+    finally:
+        if workers_pool is not None:
+            workers_pool.shutdown()
+
+    # Number tile clusters consecutively across tiles
+    labels = np.empty(len(maxima), dtype=np.intp)
+    offset = 0
+    for group, group_labels in zip(groups, local):
+        labels[group] = group_labels + offset
+        offset += group_labels.max() + 1
+
+    # Join tile clusters linked by a pair of maxima on either side of a tile edge
+    within = maxima - cells * tile
+    edge = np.flatnonzero(np.any((within < eps) | (within >= tile - eps), axis=1))
+    pairs = cKDTree(maxima[edge]).query_pairs(eps, output_type="ndarray")
+    pairs = edge[pairs].reshape(-1, 2)
+    pairs = pairs[tile_ids[pairs[:, 0]] != tile_ids[pairs[:, 1]]]
+    links = coo_matrix((np.ones(len(pairs)), (labels[pairs[:, 0]], labels[pairs[:, 1]])), shape=(offset, offset))
+    return connected_components(links, directed=False)[1][labels]
+
+
+def maxima_regions(maxima, eps=20, pad=10, tile=None, workers=None, pool="process"):
+    """Bounding boxes ((x_min, y_min), (x_max, y_max)) of DBSCAN clusters.
+
+    ``maxima`` are (row, col) coordinates; clusters of a single maximum are
+    dropped and every box is grown by ``pad`` pixels.  With ``tile`` the
+    clustering is split into tiles by :func:`tiled_cluster_labels`.
+    """
+    if len(maxima) == 0:
+        return []
+    if tile is None:
+        labels = cluster_labels(maxima, eps)
+    else:
+        labels = tiled_cluster_labels(maxima, eps, tile, workers, pool)
+
+    regions = []
+    for cluster_id in np.unique(labels):
+        cluster_coords = maxima[labels == cluster_id]
+        if len(cluster_coords) > 1:
+            x_min = np.min(cluster_coords[:, 1]) - pad
+            x_max = np.max(cluster_coords[:, 1]) + pad
+            y_min = np.min(cluster_coords[:, 0]) - pad
+            y_max = np.max(cluster_coords[:, 0]) + pad
+            regions.append(((x_min, y_min), (x_max, y_max)))
+    return regions
+
+
+def mask_clusters(mask, eps=20):
+    """Cluster ids of the maxima marked in a boolean ``mask``, as DBSCAN's.
+
+    Returns an int array that is 0 off the mask and numbers clusters from 1
+    in the scan order of their first pixel, the cluster count, and the edge
+    pixels of the mask.  The clusters are found without listing every pair
+    of nearby maxima, which explodes on plateaus where whole areas are
+    maxima.  Touching maxima (``ndimage.label``) are always within ``eps``
+    (at least 1.5) of each other, so each plateau is one node.  The pixel
+    of a plateau closest to any outside point lies on its edge, so only
+    edge pixels are compared to link plateaus within ``eps`` of each other.
+    """
+    from scipy.ndimage import binary_erosion, label
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    plateaus, count = label(mask, structure=np.ones((3, 3)))
+    edge = mask & ~binary_erosion(mask)
+    if count == 0:
+        return plateaus, 0, edge
+    points = np.argwhere(edge)
+    pairs = cKDTree(points).query_pairs(eps, output_type="ndarray")
+    nodes = plateaus[edge] - 1
+    links = coo_matrix((np.ones(len(pairs)), (nodes[pairs[:, 0]], nodes[pairs[:, 1]])), shape=(count, count))
+    count, clusters = connected_components(links, directed=False)
+
+    # Plateaus are numbered in scan order, so clusters come out in DBSCAN's order
+    labels = np.zeros(plateaus.shape, dtype=np.int32)
+    labels[mask] = clusters[plateaus[mask] - 1] + 1
+    return labels, count, edge
+
+
+def mask_regions(mask, eps=20, pad=10, origin=(0, 0)):
+    """:func:`maxima_regions` of the maxima marked in a boolean ``mask``.
+
+    The boxes are the same as DBSCAN's, in the same order; the clusters come
+    from :func:`mask_clusters` and each box from ``ndimage.find_objects``.
+    ``origin`` is the (row, col) of ``mask[0, 0]`` in the map.
+    """
+    from scipy.ndimage import find_objects
+
+    labels, count, _ = mask_clusters(mask, eps)
+    if count == 0:
+        return []
+    sizes = np.bincount(labels[mask])
+    regions = []
+    for cluster_id, (rows, cols) in enumerate(find_objects(labels), start=1):
+        if sizes[cluster_id] > 1:
+            x_min, x_max = origin[1] + cols.start - pad, origin[1] + cols.stop - 1 + pad
+            y_min, y_max = origin[0] + rows.start - pad, origin[0] + rows.stop - 1 + pad
+            regions.append(((x_min, y_min), (x_max, y_max)))
+    return regions
+
+
+def block_clusters(values, core, size=20, min_response=None, eps=20):
+    # mask_clusters of one block's maxima, summarised as each cluster's
+    # (row_min, row_max, col_min, col_max) box, pixel count and first pixel,
+    # plus the edge pixels within eps of the block border and their cluster;
+    # the picklable unit of work of tiled_mask_regions
+    from scipy.ndimage import find_objects
+
+    mask = core_mask(values, core, size, min_response)
+    labels, count, edge = mask_clusters(mask, eps)
+    boxes = np.array([(rows.start, rows.stop - 1, cols.start, cols.stop - 1)
+                      for rows, cols in find_objects(labels)], dtype=np.intp).reshape(-1, 4)
+    sizes = np.bincount(labels.ravel(), minlength=count + 1)[1:]
+    ids, first = np.unique(labels.ravel(), return_index=True)
+    first = np.column_stack(np.unravel_index(first[ids > 0], labels.shape))
+
+    height, width = mask.shape
+    near_rows = (np.arange(height) < eps) | (np.arange(height) >= height - eps)
+    near_cols = (np.arange(width) < eps) | (np.arange(width) >= width - eps)
+    edge &= near_rows[:, None] | near_cols
+    return boxes, sizes, first, np.argwhere(edge), labels[edge] - 1
+
+
+def tiled_mask_regions(height_map, eps=20, pad=10, tile=1024, size=20, min_response=None, workers=None,
+                       pool="process"):
+    """:func:`mask_regions` of :func:`edge_maxima`, one tile at a time.
+
+    Each tile's maxima are clustered on their own (by ``workers``, if given)
+    and summarised by box, size and first pixel, so no whole-map mask or
+    label image is built.  Clusters are then merged as in
+    :func:`tiled_cluster_labels`: the closest pixels of two clusters in
+    different tiles lie on the edges of their tile's mask, so only edge
+    pixels within ``eps`` of a tile border are compared.  The boxes and
+    their order are the same as :func:`mask_regions` on the whole map.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    blocks = map_blocks(height_map, functools.partial(block_clusters, eps=eps), tile, size, min_response,
+                        workers, pool)
+    parts = []
+    offset = 0
+    for tile_id, (rows, cols, (boxes, sizes, first, points, labels)) in enumerate(blocks):
+        corner = np.array([rows.start, cols.start])
+        tile_ids = np.full(len(points), tile_id)
+        parts.append((boxes + np.repeat(corner, 2), sizes, first + corner, points + corner, labels + offset, tile_ids))
+        offset += len(sizes)
+    if offset == 0:
+        return []
+    boxes, sizes, first, points, point_labels, point_tiles = (np.concatenate(part) for part in zip(*parts))
+
+    # Join tile clusters linked by a pair of maxima on either side of a tile edge
+    within = maxima - cells * tile
+    edge = np.flatnonzero(np.any((within < eps) | (within >= tile - eps), axis=1))
+    pairs = cKDTree(maxima[edge]).query_pairs(eps, output_type="ndarray")
+    pairs = edge[pairs].reshape(-1, 2)
+    pairs = pairs[tile_ids[pairs[:, 0]] != tile_ids[pairs[:, 1]]]
+    links = coo_matrix((np.ones(len(pairs)), (labels[pairs[:, 0]], labels[pairs[:, 1]])), shape=(offset, offset))
+    return connected_components(links, directed=False)[1][labels]
+
+
+def maxima_regions(maxima, eps=20, pad=10, tile=None, workers=None, pool="process"):
+    """Bounding boxes ((x_min, y_min), (x_max, y_max)) of DBSCAN clusters.
+
+    ``maxima`` are (row, col) coordinates; clusters of a single maximum are
+    dropped and every box is grown by ``pad`` pixels.  With ``tile`` the
+    clustering is split into tiles by :func:`tiled_cluster_labels`.
+    """
+    if len(maxima) == 0:
+        return []
+    if tile is None:
+        labels = cluster_labels(maxima, eps)
+    else:
+        labels = tiled_cluster_labels(maxima, eps, tile, workers, pool)
+
+    regions = []
+    for cluster_id in np.unique(labels):
+        cluster_coords = maxima[labels == cluster_id]
+        if len(cluster_coords) > 1:
+            x_min = np.min(cluster_coords[:, 1]) - pad
+            x_max = np.max(cluster_coords[:, 1]) + pad
+            y_min = np.min(cluster_coords[:, 0]) - pad
+            y_max = np.max(cluster_coords[:, 0]) + pad
+            regions.append(((x_min, y_min), (x_max, y_max)))
+    return regions
+
+
+def mask_clusters(mask, eps=20):
+    """Cluster ids of the maxima marked in a boolean ``mask``, as DBSCAN's.
+
+    Returns an int array that is 0 off the mask and numbers clusters from 1
+    in the scan order of their first pixel, the cluster count, and the edge
+    pixels of the mask.  The clusters are found without listing every pair
+    of nearby maxima, which explodes on plateaus where whole areas are
+    maxima.  Touching maxima (``ndimage.label``) are always within ``eps``
+    (at least 1.5) of each other, so each plateau is one node.  The pixel
+    of a plateau closest to any outside point lies on its edge, so only
+    edge pixels are compared to link plateaus within ``eps`` of each other.
+    """
+    from scipy.ndimage import binary_erosion, label
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    plateaus, count = label(mask, structure=np.ones((3, 3)))
+    edge = mask & ~binary_erosion(mask)
+    if count == 0:
+        return plateaus, 0, edge
+    points = np.argwhere(edge)
+    pairs = cKDTree(points).query_pairs(eps, output_type="ndarray")
+    nodes = plateaus[edge] - 1
+    links = coo_matrix((np.ones(len(pairs)), (nodes[pairs[:, 0]], nodes[pairs[:, 1]])), shape=(count, count))
+    count, clusters = connected_components(links, directed=False)
+
+    # Plateaus are numbered in scan order, so clusters come out in DBSCAN's order
+    labels = np.zeros(plateaus.shape, dtype=np.int32)
+    labels[mask] = clusters[plateaus[mask] - 1] + 1
+    return labels, count, edge
+
+
+def mask_regions(mask, eps=20, pad=10, origin=(0, 0)):
+    """:func:`maxima_regions` of the maxima marked in a boolean ``mask``.
+
+    The boxes are the same as DBSCAN's, in the same order; the clusters come
+    from :func:`mask_clusters` and each box from ``ndimage.find_objects``.
+    ``origin`` is the (row, col) of ``mask[0, 0]`` in the map.
+    """
+    from scipy.ndimage import find_objects
+
+    labels, count, _ = mask_clusters(mask, eps)
+    if count == 0:
+        return []
+    sizes = np.bincount(labels[mask])
+    regions = []
+    for cluster_id, (rows, cols) in enumerate(find_objects(labels), start=1):
+        if sizes[cluster_id] > 1:
+            x_min, x_max = origin[1] + cols.start - pad, origin[1] + cols.stop - 1 + pad
+            y_min, y_max = origin[0] + rows.start - pad, origin[0] + rows.stop - 1 + pad
+            regions.append(((x_min, y_min), (x_max, y_max)))
+    return regions
+
+
+def block_clusters(values, core, size=20, min_response=None, eps=20):
+    # mask_clusters of one block's maxima, summarised as each cluster's
+    # (row_min, row_max, col_min, col_max) box, pixel count and first pixel,
+    # plus the edge pixels within eps of the block border and their cluster;
+    # the picklable unit of work of tiled_mask_regions
+    from scipy.ndimage import find_objects
+
+    mask = core_mask(values, core, size, min_response)
+    labels, count, edge = mask_clusters(mask, eps)
+    boxes = np.array([(rows.start, rows.stop - 1, cols.start, cols.stop - 1)
+                      for rows, cols in find_objects(labels)], dtype=np.intp).reshape(-1, 4)
+    sizes = np.bincount(labels.ravel(), minlength=count + 1)[1:]
+    ids, first = np.unique(labels.ravel(), return_index=True)
+    first = np.column_stack(np.unravel_index(first[ids > 0], labels.shape))
+
+    height, width = mask.shape
+    near_rows = (np.arange(height) < eps) | (np.arange(height) >= height - eps)
+    near_cols = (np.arange(width) < eps) | (np.arange(width) >= width - eps)
+    edge &= near_rows[:, None] | near_cols
+    return boxes, sizes, first, np.argwhere(edge), labels[edge] - 1
+
+
+def tiled_mask_regions(height_map, eps=20, pad=10, tile=1024, size=20, min_response=None, workers=None,
+                       pool="process"):
+    """:func:`mask_regions` of :func:`edge_maxima`, one tile at a time.
+
+    Each tile's maxima are clustered on their own (by ``workers``, if given)
+    and summarised by box, size and first pixel, so no whole-map mask or
+    label image is built.  Clusters are then merged as in
+    :func:`tiled_cluster_labels`: the closest pixels of two clusters in
+    different tiles lie on the edges of their tile's mask, so only edge
+    pixels within ``eps`` of a tile border are compared.  The boxes and
+    their order are the same as :func:`mask_regions` on the whole map.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    blocks = map_blocks(height_map, functools.partial(block_clusters, eps=eps), tile, size, min_response,
+                        workers, pool)
+    boxes, sizes, first, points, point_labels, point_tiles = [], [], [], [], [], []
+    offset = 0
+    for tile_id, (rows, cols, (block_boxes, block_sizes, block_first, block_points, block_labels)) in enumerate(
+            blocks):
+        corner = np.array([rows.start, cols.start])
+        boxes.append(block_boxes + np.repeat(corner, 2))
+        sizes.append(block_sizes)
+        first.append(block_first + corner)
+        points.append(block_points + corner)
+        point_labels.append(block_labels + offset)
+        point_tiles.append(np.full(len(block_points), tile_id))
+        offset += len(block_sizes)
+    if offset == 0:
+        return []
+    boxes, sizes, first = np.concatenate(boxes), np.concatenate(sizes), np.concatenate(first)
+    points, point_labels, point_tiles = np.concatenate(points), np.concatenate(point_labels), np.concatenate(
+        point_tiles)
+
+    # Join tile clusters linked by a pair of edge pixels on either side of a tile border
+    pairs = cKDTree(points).query_pairs(eps, output_type="ndarray").reshape(-1, 2)
+    pairs = pairs[point_tiles[pairs[:, 0]] != point_tiles[pairs[:, 1]]]
+    links = coo_matrix((np.ones(len(pairs)), (point_labels[pairs[:, 0]], point_labels[pairs[:, 1]])),
+                       shape=(offset, offset))
+    count, clusters = connected_components(links, directed=False)
+
+    # Each merged cluster's box, pixel count and first pixel in scan order
+    merged = np.empty((count, 4), dtype=np.intp)
+    for column, reduce in enumerate((np.minimum, np.maximum, np.minimum, np.maximum)):
+        merged[:, column] = boxes[:, column].max() if reduce is np.minimum else boxes[:, column].min()
+        reduce.at(merged[:, column], clusters, boxes[:, column])
+    merged_sizes = np.bincount(clusters, weights=sizes, minlength=count)
+    first_index = np.full(count, height_map.shape[0] * height_map.shape[1])
+    np.minimum.at(first_index, clusters, first[:, 0] * height_map.shape[1] + first[:, 1])
+
+    regions = []
+    for cluster_id in np.argsort(first_index):
+        if merged_sizes[cluster_id] > 1:
+            y_min, y_max, x_min, x_max = (int(v) for v in merged[cluster_id])
+            regions.append(((x_min - pad, y_min - pad), (x_max + pad, y_max + pad)))
+    return regions
@@ -0,0 +1,39 @@
+"""Salp Swarm Algorithm."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+class SalpSwarmOptimizer(SwarmOptimizer):
+    def initialize(self):
+        super().initialize()
+        self.state.best_positions[...] = self.state.positions
+
+    def promote(self, leader):
+        # Swap the current best salp to the head of the chain
+        if leader == 0:
+            return
+        for array in self.state.arrays():
+            array[[0, leader]] = array[[leader, 0]]
+
+    def step(self):
+        state = self.state
+        positions = state.positions
+        state.fitness[...] = self.evaluate(positions)
+        state.update_personal_best()
+
+        leader = state.best_index()
+        self.record_best(positions[leader], state.fitness[leader])
+        self.promote(leader)
+        food = self.best_position
+
+        # The leader explores around the food source, less and less widely
+        low, high = self.bounds[:, 0], self.bounds[:, 1]
+        c1 = 2 * np.exp(-(4 * self.progress) ** 2)
+        offset = c1 * ((high - low) * self.rng.random(self.dimensions) + low)
+        positions[0] = np.where(self.rng.random(self.dimensions) < 0.5, food + offset, food - offset)
+
+        # Each follower moves halfway towards the salp ahead of it
+        positions[1:] = (positions[1:] + positions[:-1]) / 2
+        self.clip(positions, out=positions)
@@ -0,0 +1,71 @@
+"""Structure-of-arrays storage for swarm agents."""
+
+import numpy as np
+
+
+class SwarmState:
+    """Preallocated, contiguous per-agent arrays.
+
+    Row ``i`` of every array belongs to agent ``i``.  Optimizers update the
+    arrays in place instead of building a dict (and fresh small arrays) per
+    agent, so a swarm costs a few bytes per agent per field.
+    """
+
+    def __init__(self, size, dimensions):
+        self.positions = np.zeros((size, dimensions))
+        self.velocities = np.zeros((size, dimensions))
+        self.best_positions = np.zeros((size, dimensions))
+        self.best_values = np.full(size, np.inf)
+        self.fitness = np.full(size, np.inf)
+
+    @property
+    def size(self):
+        return self.positions.shape[0]
+
+    @property
+    def dimensions(self):
+        return self.positions.shape[1]
+
+    def arrays(self):
+        return (self.positions, self.velocities, self.best_positions, self.best_values, self.fitness)
+
+    def update_personal_best(self):
+        # Copy current positions over personal bests wherever fitness improved
+        improved = self.fitness < self.best_values
+        np.copyto(self.best_values, self.fitness, where=improved)
+        np.copyto(self.best_positions, self.positions, where=improved[:, None])
+        return improved
+
+    def best_index(self):
+        return int(np.argmin(self.fitness))
+
+
+class PathHistory:
+    """Fixed-size ring buffer of recent swarm positions.
+
+    Holds the last ``capacity`` snapshots of an ``(N, D)`` position array, so
+    keeping trails for visualization costs the same memory on iteration ten
+    as on iteration ten thousand.
+    """
+
+    def __init__(self, capacity, size, dimensions):
+        self.buffer = np.zeros((capacity, size, dimensions))
+        self.head = 0
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return self.buffer.shape[0]
+
+    def __len__(self):
+        return self.count
+
+    def append(self, positions):
+        self.buffer[self.head] = positions
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def ordered(self):
+        # Snapshots oldest first, shaped (count, N, D)
+        start = (self.head - self.count) % self.capacity
+        return np.take(self.buffer, np.arange(start, start + self.count), axis=0, mode="wrap")
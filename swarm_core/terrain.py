@@ -0,0 +1,294 @@
+"""Multi-start PSO over a height map for its local minima or maxima."""
+
+import numpy as np
+
+from .base import SwarmOptimizer, image_bounds
+from .fitness import bilinear, bilinear_corners
+
+
+def sample_heights(height_map, positions):
+    # Height under each (x, y) position, truncated to whole pixels
+    positions = positions.astype(np.intp)
+    return height_map[positions[:, 1], positions[:, 0]]
+
+
+def sobel(values):
+    # d/dx and d/dy per pixel (the 3x3 Sobel sums divided by 8), edges replicated
+    p = np.pad(values, 1, mode="edge")
+    rows = p[:-2] + 2 * p[1:-1] + p[2:]
+    cols = p[:, :-2] + 2 * p[:, 1:-1] + p[:, 2:]
+    return (rows[:, 2:] - rows[:, :-2]) / 8, (cols[2:] - cols[:-2]) / 8
+
+
+def sobel_at(values, rows, cols):
+    # sobel() at individual pixels, reading only their 3x3 neighbourhoods
+    height, width = values.shape
+    r = [np.clip(rows + d, 0, height - 1) for d in (-1, 0, 1)]
+    c = [np.clip(cols + d, 0, width - 1) for d in (-1, 0, 1)]
+    v = [[np.asarray(values[r[i], c[j]], dtype=np.float32) for j in range(3)] for i in range(3)]
+    dx = (v[0][2] + 2 * v[1][2] + v[2][2] - v[0][0] - 2 * v[1][0] - v[2][0]) / 8
+    dy = (v[2][0] + 2 * v[2][1] + v[2][2] - v[0][0] - 2 * v[0][1] - v[0][2]) / 8
+    return dx, dy
+
+
+class HeightField:
+    """Height map kept as float32 and sampled bilinearly at sub-pixel positions.
+
+    With ``gradients=True`` the Sobel derivatives are computed once up front
+    and ``gradient`` interpolates them the same way.  Memory-mapped maps
+    (and :class:`~swarm_core.raster.RasterView`) are sampled in place
+    instead, with gradients taken from each sample's neighbourhood, so
+    only the pixels the particles visit are read.
+    """
+
+    def __init__(self, height_map, gradients=False):
+        self.lazy = isinstance(height_map, np.memmap) or not isinstance(height_map, np.ndarray)
+        self.heights = height_map if self.lazy else np.asarray(height_map, dtype=np.float32)
+        self.gradients = gradients
+        self.dx = self.dy = None
+        if gradients and not self.lazy:
+            self.dx, self.dy = sobel(self.heights)
+
+    @property
+    def shape(self):
+        return self.heights.shape
+
+    def __call__(self, positions):
+        return bilinear(self.heights, positions)
+
+    def gradient(self, positions):
+        if not self.gradients:
+            raise ValueError("HeightField was built without gradients")
+        if not self.lazy:
+            return np.column_stack([bilinear(self.dx, positions), bilinear(self.dy, positions)])
+
+        x0, x1, y0, y1, fx, fy = bilinear_corners(self.shape, positions)
+        corners = [sobel_at(self.heights, y, x) for y, x in ((y0, x0), (y0, x1), (y1, x0), (y1, x1))]
+        weights = ((1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy)
+        dx = sum(w * d[0] for w, d in zip(weights, corners))
+        dy = sum(w * d[1] for w, d in zip(weights, corners))
+        return np.column_stack([dx, dy])
+
+
+class ExtremaSet:
+    """Distinct extrema in the order they were found.
+
+    With ``radius=None`` an extremum is new when its height has not been
+    seen before (a hash set of heights), like the global-best list of the
+    original analyzers.  With a radius it is new when no earlier extremum
+    lies within ``radius`` pixels; positions are bucketed in radius-sized
+    grid cells so each check only looks at the 3x3 cells around it.
+    """
+
+    def __init__(self, radius=None):
+        self.radius = radius
+        self._positions = []
+        self._values = []
+        self._seen = set()  # Heights already recorded, without a radius
+        self._cells = {}  # Grid cell -> indices of extrema inside it, with a radius
+
+    def __len__(self):
+        return len(self._positions)
+
+    @property
+    def positions(self):
+        return np.array(self._positions).reshape(-1, 2)
+
+    @property
+    def values(self):
+        return np.array(self._values)
+
+    def cell(self, position):
+        return tuple((np.asarray(position) // self.radius).astype(np.int64))
+
+    def add(self, position, value):
+        """Record an extremum unless it duplicates one already found."""
+        if self.radius is None:
+            if value in self._seen:
+                return False
+            self._seen.add(value)
+        else:
+            cx, cy = self.cell(position)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for index in self._cells.get((cx + dx, cy + dy), ()):
+                        if np.hypot(*(self._positions[index] - position)) <= self.radius:
+                            return False
+            self._cells.setdefault((cx, cy), []).append(len(self._positions))
+        self._positions.append(np.array(position, dtype=np.float64))
+        self._values.append(value)
+        return True
+
+
+class TerrainOptimizer(SwarmOptimizer):
+    """PSO over ``height_map`` that collects every distinct global best.
+
+    Particles are sampled with one fancy-indexing lookup per iteration, and
+    the global best of each iteration is offered to an :class:`ExtremaSet`,
+    which is the list of minima (or maxima) the analyzers display.
+
+    With ``subpixel=True`` particles move continuously over a bilinear
+    :class:`HeightField` instead of being truncated to whole pixels.  With
+    ``gradient_step`` (pixels) every personal best also tries one step
+    downhill (uphill when maximizing) along the Sobel gradient each
+    iteration and keeps it if it is better.
+    """
+
+    def __init__(self, height_map, swarm_size, maximize=False, inertia=0.5, dedup_radius=None, subpixel=False,
+                 gradient_step=None, seed=None):
+        self.height_map = height_map
+        self.sign = -1.0 if maximize else 1.0  # Maxima are minima of the negated map
+        self.subpixel = subpixel
+        self.gradient_step = gradient_step
+        self.field = None
+        if subpixel or gradient_step is not None:
+            self.field = HeightField(height_map, gradients=gradient_step is not None)
+        height, width = height_map.shape[:2]
+        super().__init__(self.signed_heights, image_bounds(width, height), swarm_size, seed=seed)
+        self.inertia = inertia
+        self.extrema = ExtremaSet(dedup_radius)
+
+    def signed_heights(self, positions):
+        if self.subpixel:
+            return self.sign * self.field(positions)
+        return self.sign * sample_heights(self.height_map, positions).astype(np.float64)
+
+    def refine(self):
+        # One normalized gradient step per personal best, kept where it helps
+        state = self.state
+        gradient = self.field.gradient(state.best_positions)
+        norm = np.hypot(gradient[:, 0], gradient[:, 1])[:, None]
+        direction = np.divide(gradient, norm, out=np.zeros_like(gradient), where=norm > 0)
+        trial = self.clip(state.best_positions - self.sign * self.gradient_step * direction)
+        if not self.subpixel:
+            np.trunc(trial, out=trial)
+        values = self.evaluate(trial)
+        improved = values < state.best_values
+        np.copyto(state.best_values, values, where=improved)
+        np.copyto(state.best_positions, trial, where=improved[:, None])
+
+    def initialize(self):
+        super().initialize()
+        self.extrema = ExtremaSet(self.extrema.radius)
+        state = self.state
+        state.velocities[...] = self.rng.uniform(-1, 1, state.velocities.shape)
+        state.best_positions[...] = state.positions
+
+    def step(self):
+        state = self.state
+        positions, velocities = state.positions, state.velocities
+
+        state.fitness[...] = self.evaluate(positions)
+        state.update_personal_best()
+        if self.gradient_step is not None:
+            self.refine()
+        best = int(np.argmin(state.best_values))
+        best_position = state.best_positions[best].copy()
+        self.extrema.add(best_position, self.sign * state.best_values[best])
+        self.record_best(best_position, state.best_values[best])
+
+        r_cognitive = self.rng.random((self.swarm_size, 1))
+        r_social = self.rng.random((self.swarm_size, 1))
+        velocities *= self.inertia
+        velocities += r_cognitive * (state.best_positions - positions)
+        velocities += r_social * (best_position - positions)
+        positions += velocities
+        if not self.subpixel:
+            # Whole-pixel moves, as the analyzers have always done
+            np.trunc(positions, out=positions)
+        self.clip(positions, out=positions)
+
+
+def downsample(values, band_rows=512):
+    # Halve both axes by averaging 2x2 blocks; an odd last row or column is
+    # paired with itself.  Integer maps stay integer so filters behave alike.
+    # Works through ``band_rows`` output rows at a time, so only a band of
+    # the input is ever held as float32.
+    height, width = values.shape
+    integer = np.issubdtype(values.dtype, np.integer)
+    half = np.empty(((height + 1) // 2, (width + 1) // 2), dtype=values.dtype if integer else np.float32)
+    for r0 in range(0, len(half), band_rows):
+        r1 = min(len(half), r0 + band_rows)
+        v = np.asarray(values[2 * r0:2 * r1], dtype=np.float32)
+        v = np.pad(v, ((0, v.shape[0] % 2), (0, width % 2)), mode="edge")
+        band = (v[0::2, 0::2] + v[1::2, 0::2] + v[0::2, 1::2] + v[1::2, 1::2]) / 4
+        half[r0:r1] = np.rint(band) if integer else band
+    return half
+
+
+def build_pyramid(values, levels):
+    # Full resolution first, each further level half the size of the last
+    pyramid = [values]
+    while len(pyramid) < levels and min(pyramid[-1].shape[:2]) >= 2:
+        pyramid.append(downsample(pyramid[-1]))
+    return pyramid
+
+
+def window_extrema(values, positions, radius, maximize=False):
+    # Move every (x, y) position to the lowest (highest) pixel within radius
+    height, width = values.shape
+    refined = np.empty((len(positions), 2))
+    heights = np.empty(len(positions))
+    for i, (x, y) in enumerate(np.asarray(positions, dtype=np.intp)):
+        x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+        y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+        window = values[y0:y1, x0:x1]
+        index = np.argmax(window) if maximize else np.argmin(window)
+        dy, dx = divmod(int(index), window.shape[1])
+        refined[i] = x0 + dx, y0 + dy
+        heights[i] = window[dy, dx]
+    return refined, heights
+
+
+class PyramidTerrainOptimizer:
+    """Coarse-to-fine :class:`TerrainOptimizer`.
+
+    The swarm runs on the coarsest of ``levels`` 2x-downsampled copies of
+    the height map.  Each extremum it finds is then moved to the best pixel
+    within ``window`` pixels of its position at every finer level in turn,
+    so the full-resolution map is only read in small windows.  Positions
+    and extrema are reported in full-resolution pixels.
+    """
+
+    def __init__(self, height_map, swarm_size, levels=3, window=2, maximize=False, dedup_radius=None, seed=None,
+                 **options):
+        self.pyramid = build_pyramid(height_map, levels)
+        self.maximize = maximize
+        self.window = window
+        self.optimizer = TerrainOptimizer(self.pyramid[-1], swarm_size, maximize=maximize, seed=seed, **options)
+        self.extrema = ExtremaSet(dedup_radius)
+        self.best_position = None
+        self.best_value = float("inf")
+
+    @property
+    def scale(self):
+        return 2 ** (len(self.pyramid) - 1)
+
+    @property
+    def positions(self):
+        positions = self.optimizer.positions
+        return None if positions is None else positions * self.scale
+
+    @property
+    def iteration(self):
+        return self.optimizer.iteration
+
+    def refine(self, positions, values):
+        # Carry coarse extrema down the pyramid, one level at a time
+        for level in reversed(self.pyramid[:-1]):
+            positions, values = window_extrema(level, positions * 2, self.window, self.maximize)
+        return positions, values
+
+    def run(self, iterations, callback=None):
+        observer = None if callback is None else (lambda optimizer: callback(self))
+        self.extrema = ExtremaSet(self.extrema.radius)
+        self.best_position, self.best_value = None, float("inf")
+        self.optimizer.run(iterations, callback=observer)
+        coarse = self.optimizer.extrema
+        positions, values = self.refine(coarse.positions, coarse.values)
+        for position, value in zip(positions, values):
+            self.extrema.add(position, value)
+            signed = -value if self.maximize else value
+            if signed < self.best_value:
+                self.best_position, self.best_value = position, float(signed)
+        return self.best_position, self.best_value
@@ -0,0 +1,55 @@
+"""Whale Optimization Algorithm."""
+
+import numpy as np
+
+from .base import SwarmOptimizer
+
+
+def linear_a_schedule(iteration, iterations):
+    # Decreases linearly from 2 to 0 over the run
+    return 2 - iteration * (2 / iterations)
+
+
+class WhaleOptimizer(SwarmOptimizer):
+    def __init__(self, objective, bounds, swarm_size, a_schedule=linear_a_schedule, spiral_shape=1.0, seed=None):
+        # a_schedule(iteration, iterations) returns the "a" coefficient that
+        # shrinks the encircling radius; spiral_shape is the "b" constant of
+        # the logarithmic spiral.
+        super().__init__(objective, bounds, swarm_size, seed=seed)
+        self.a_schedule = a_schedule
+        self.spiral_shape = spiral_shape
+
+    def step(self):
+        state = self.state
+        positions = state.positions
+        state.fitness[...] = self.evaluate(positions)
+        leader = state.best_index()
+        # record_best keeps its own copy, so moving the leader cannot move the prey
+        self.record_best(positions[leader], state.fitness[leader])
+        prey = self.best_position
+
+        n = self.swarm_size
+        a = self.a_schedule(self.progress * self.iterations, self.iterations)
+        A = 2 * a * self.rng.random((n, 1)) - a  # Encircling prey parameter
+        C = 2 * self.rng.random((n, 1))          # Shrinking parameter
+        spiral = self.rng.random(n) >= 0.5
+        explore = ~spiral & (np.abs(A[:, 0]) >= 1)
+        encircle = ~spiral & ~explore
+
+        new_positions = np.empty_like(positions)
+
+        # Exploitation: shrink towards the best whale found so far
+        D = np.abs(C[encircle] * prey - positions[encircle])
+        new_positions[encircle] = prey - A[encircle] * D
+
+        # Exploration: swim relative to a randomly chosen whale instead
+        others = positions[self.rng.integers(n, size=np.count_nonzero(explore))]
+        D = np.abs(C[explore] * others - positions[explore])
+        new_positions[explore] = others - A[explore] * D
+
+        # Bubble-net attack along a logarithmic spiral around the prey
+        l = self.rng.uniform(-1, 1, (np.count_nonzero(spiral), 1))
+        D = np.abs(prey - positions[spiral])
+        new_positions[spiral] = D * np.exp(self.spiral_shape * l) * np.cos(2 * np.pi * l) + prey
+
+        self.clip(new_positions, out=positions)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+
+def textured_map(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    rows, cols = np.mgrid[0:shape[0], 0:shape[1]]
+    values = 127 + 60 * np.sin(cols / 37.0) * np.cos(rows / 53.0) + rng.normal(0, 5, shape)
+    return values.clip(0, 255).astype(np.uint8)
+
+
+def region_boxes(found):
+    return [tuple(tuple(int(v) for v in corner) for corner in box) for box in found]
+
+
+@pytest.fixture
+def textured():
+    # Smooth uint8 height map with a little noise: textured(shape, seed=0)
+    return textured_map
+
+
+@pytest.fixture
+def boxes():
+    # Region boxes as tuples of Python ints, in the order they were found
+    return region_boxes
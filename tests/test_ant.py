@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from swarm_core import AntColonyOptimizer
+
+
+def cities(count=60, seed=0):
+    return np.random.default_rng(seed).uniform(0, 500, (count, 2))
+
+
+def run(workers, **options):
+    with AntColonyOptimizer(cities(), 150, workers=workers, ant_block=32, seed=7, **options) as optimizer:
+        best_path, best_length = optimizer.run(4)
+        return optimizer.paths.copy(), best_path, best_length
+
+
+@pytest.mark.parametrize("options", [{}, {"candidate_count": 8}, {"local_search": "best"}])
+def test_tours_identical_for_any_worker_count(options):
+    paths, best_path, best_length = run(None, **options)
+    for workers in (2, 3):
+        other_paths, other_best, other_length = run(workers, **options)
+        np.testing.assert_array_equal(other_paths, paths)
+        np.testing.assert_array_equal(other_best, best_path)
+        assert other_length == best_length
+
+
+def test_tours_visit_every_city_once():
+    paths, _, _ = run(None, candidate_count=8)
+    assert np.all(np.sort(paths, axis=1) == np.arange(paths.shape[1]))
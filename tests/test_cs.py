@@ -0,0 +1,16 @@
+import math
+
+import pytest
+
+from swarm_core.cs import mantegna_sigma
+
+
+def closed_form(alpha):
+    numerator = math.gamma(1 + alpha) * math.sin(math.pi * alpha / 2)
+    denominator = math.gamma((1 + alpha) / 2) * alpha * 2 ** ((alpha - 1) / 2)
+    return (numerator / denominator) ** (1 / alpha)
+
+
+@pytest.mark.parametrize("alpha, expected", [(1.0, 1.0), (1.5, 0.6965745), (1.9, closed_form(1.9))])
+def test_mantegna_sigma(alpha, expected):
+    assert mantegna_sigma(alpha) == pytest.approx(expected)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from swarm_core import DragonflyOptimizer, GaussianProcess, RBFKernel, SparseGP, approximation_error
+
+
+def sphere(X):
+    return np.sum(np.asarray(X) ** 2, axis=-1)
+
+
+@pytest.mark.parametrize("gp_mode", ["exact", "window", "sparse"])
+def test_rerun_starts_from_fresh_samples(gp_mode):
+    optimizer = DragonflyOptimizer(sphere, [(-5, 5)] * 2, 10, gp_mode=gp_mode, random_initial_points=10,
+                                   inducing_count=20, seed=0)
+    optimizer.run(3)
+    first = optimizer.gp.size, getattr(optimizer.gp, "count", None)
+    optimizer.run(3)
+    assert (optimizer.gp.size, getattr(optimizer.gp, "count", None)) == first
+    if gp_mode == "exact":
+        assert optimizer.gp.size == 13
+    if gp_mode == "sparse":
+        assert optimizer.gp.count == 13
+
+
+def test_approximation_error_ordering_on_smooth_target():
+    # Holdout points run past the samples and inducing points, where SoR's
+    # variance collapses to zero while FITC keeps the prior residual
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, (200, 1))
+    Y = np.sin(X).ravel()
+    X_holdout = np.linspace(-3, 13, 300)[:, None]
+    kernel = RBFKernel(2.0)
+    inducing = np.linspace(0, 10, 10)[:, None]
+    errors = [approximation_error(model, X, Y, X_holdout)["std_rmse"] for model in (
+        GaussianProcess(kernel, noise=1e-3),
+        SparseGP(kernel, inducing, noise=1e-3, method="FITC"),
+        SparseGP(kernel, inducing, noise=1e-3, method="SoR"),
+    )]
+    assert errors[0] < 1e-6 < errors[1] < errors[2]
+
+
+def test_optimizer_approximation_error_leaves_gp_alone():
+    optimizer = DragonflyOptimizer(sphere, [(-5, 5)] * 2, 10, gp_mode="sparse", inducing_count=20, seed=0)
+    optimizer.run(3)
+    count = optimizer.gp.count
+    error = optimizer.approximation_error(count=100, holdout_count=50, rng=0)
+    assert optimizer.gp.count == count
+    assert error["mean_rmse"] > 0
+
+
+@pytest.mark.parametrize("length_scale", [2.0, [2.0], [2.0, 3.0]])
+def test_theta_round_trip_keeps_ard(length_scale):
+    kernel = RBFKernel(length_scale, variance=1.5)
+    kernel.theta = kernel.theta + 0.1
+    assert kernel.length_scale.shape == np.shape(length_scale)
+    np.testing.assert_allclose(kernel.length_scale, np.asarray(length_scale) * np.exp(0.1))
+    assert kernel.variance == pytest.approx(1.5 * np.exp(0.1))
+
+
+def test_one_dimensional_ard_fit():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, (40, 1))
+    gp = GaussianProcess(RBFKernel([1.0]), noise=1e-3)
+    gp.fit(X, np.sin(X).ravel())
+    gp.optimize_hyperparameters()
+    assert gp.kernel.length_scale.shape == (1,)
+    assert gp.predict(X[:5])[0].shape == (5,)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from swarm_core import DistanceField, DrawingFitness
+
+
+def drawing(seed=0):
+    rng = np.random.default_rng(seed)
+    walk = np.clip(np.cumsum(rng.normal(0, 3, (300, 2)), axis=0) + [150, 100], 0, [299, 199])
+    return [("line", [tuple(p) for p in walk]), ("point", (20, 30)), ("line", [(5, 190), (290, 185)])]
+
+
+def test_distance_field_close_to_exact():
+    for normalize_lines in (False, True):
+        fitness = DrawingFitness(drawing(), normalize_lines=normalize_lines)
+        exact = DistanceField(fitness, 300, 200, spacing=1)
+        field = DistanceField(fitness, 300, 200)
+        np.testing.assert_allclose(field.values, exact.values, rtol=1e-3)
+
+
+def test_exact_field_matches_fitness_at_pixels():
+    fitness = DrawingFitness(drawing(1))
+    field = DistanceField(fitness, 60, 40, spacing=1)
+    rows, cols = np.mgrid[0:40, 0:60]
+    pixels = np.column_stack([cols.ravel(), rows.ravel()]).astype(np.float64)
+    np.testing.assert_allclose(field(pixels), fitness(pixels))
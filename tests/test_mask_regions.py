@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from swarm_core import regions
+
+
+def height_maps(textured):
+    rng = np.random.default_rng(1)
+    rows, cols = np.mgrid[0:500, 0:600]
+    flat = np.full((400, 500), 90.0)
+    flat[100:200, 50:300] = rng.integers(0, 255, (100, 250))
+    return {
+        "smooth": textured((500, 600)),
+        "blobs": (np.sin(cols / 90.0) * np.sin(rows / 70.0) * 100 + 128).astype(np.uint8),
+        "noise": rng.integers(0, 255, (400, 400)).astype(np.uint8),
+        "flat": flat.astype(np.uint8),
+    }
+
+
+@pytest.mark.parametrize("name", ["smooth", "blobs", "noise", "flat"])
+def test_mask_regions_match_dbscan(textured, boxes, name):
+    mask = regions.edge_maxima(height_maps(textured)[name])
+    expected = boxes(regions.maxima_regions(np.argwhere(mask), eps=20, pad=10))
+    assert boxes(regions.mask_regions(mask, eps=20, pad=10)) == expected
+
+
+@pytest.mark.parametrize("name", ["smooth", "blobs", "noise", "flat"])
+@pytest.mark.parametrize("tile", [37, 128])
+def test_tiled_mask_regions_match_whole_map(textured, boxes, name, tile):
+    height_map = height_maps(textured)[name]
+    expected = boxes(regions.mask_regions(regions.edge_maxima(height_map), eps=20, pad=10))
+    assert regions.tiled_mask_regions(height_map, eps=20, pad=10, tile=tile) == expected
+
+
+@pytest.mark.parametrize("workers, pool", [(2, "process"), (2, "thread")])
+def test_tiled_mask_regions_with_workers(textured, boxes, workers, pool):
+    height_map = textured((500, 600))
+    expected = boxes(regions.mask_regions(regions.edge_maxima(height_map), eps=20, pad=10))
+    assert regions.tiled_mask_regions(height_map, tile=128, workers=workers, pool=pool) == expected
+
+
+@pytest.mark.parametrize("eps", [1.5, 5, 20, 20.5, 33])
+def test_mask_regions_match_dbscan_on_points(boxes, eps):
+    rng = np.random.default_rng(int(eps * 10))
+    for _ in range(20):
+        points = rng.integers(0, rng.integers(50, 800), (rng.integers(2, 400), 2))
+        plateau = np.argwhere(np.ones((5, 7), dtype=bool)) + rng.integers(0, 300, 2)
+        points = np.unique(np.concatenate([points, plateau]), axis=0)
+        mask = np.zeros(points.max(axis=0) + 1, dtype=bool)
+        mask[tuple(points.T)] = True
+        expected = boxes(regions.maxima_regions(points, eps=eps, pad=3))
+        assert boxes(regions.mask_regions(mask, eps=eps, pad=3)) == expected
+
+
+def test_no_maxima():
+    assert regions.mask_regions(np.zeros((5, 5), dtype=bool)) == []
+    assert regions.tiled_mask_regions(np.full((50, 50), 7, dtype=np.uint8), min_response=100, tile=16) == []
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from swarm_core import regions
+
+
+def partition(points, labels):
+    # Clusters as sets of points, independent of how they are numbered
+    clusters = {}
+    for point, label in zip(map(tuple, points), labels):
+        clusters.setdefault(label, set()).add(point)
+    return sorted(sorted(cluster) for cluster in clusters.values())
+
+
+@pytest.mark.parametrize("tile", [97, 256, 1000])
+@pytest.mark.parametrize("workers, pool", [(None, "process"), (2, "process"), (2, "thread")])
+def test_tiled_maxima_match_whole_map(textured, tile, workers, pool):
+    height_map = textured((600, 700))
+    expected = regions.local_maxima(height_map)
+    found = regions.tiled_maxima(height_map, tile=tile, workers=workers, pool=pool)
+    np.testing.assert_array_equal(np.unique(found, axis=0), np.unique(expected, axis=0))
+
+
+@pytest.mark.parametrize("tile", [25, 97, 256])
+@pytest.mark.parametrize("workers, pool", [(None, "process"), (2, "process"), (2, "thread")])
+def test_tiled_clusters_match_dbscan(textured, tile, workers, pool):
+    maxima = regions.local_maxima(textured((600, 700)))
+    expected = partition(maxima, regions.cluster_labels(maxima, eps=20))
+    labels = regions.tiled_cluster_labels(maxima, eps=20, tile=tile, workers=workers, pool=pool)
+    assert partition(maxima, labels) == expected
+
+
+def test_tiled_clusters_merge_across_many_edges():
+    # Sparse random points, so chains of clusters cross tile edges often
+    points = np.random.default_rng(1).integers(0, 3000, (4000, 2))
+    expected = partition(points, regions.cluster_labels(points, eps=40))
+    assert partition(points, regions.tiled_cluster_labels(points, eps=40, tile=200, workers=2)) == expected
+
+
+def test_tiled_regions_match_dbscan(textured, boxes):
+    maxima = regions.local_maxima(textured((600, 700)))
+    expected = sorted(boxes(regions.maxima_regions(maxima, eps=20, pad=10)))
+    found = regions.maxima_regions(maxima, eps=20, pad=10, tile=128, workers=2, pool="thread")
+    assert sorted(boxes(found)) == expected
+
+
+def test_unknown_pool(textured):
+    with pytest.raises(ValueError):
+        regions.tiled_maxima(textured((50, 50)), workers=2, pool="gpu")